@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import time
@@ -36,3 +37,31 @@ def initialize_weaviate():
     except Exception as e:
         logger.error(f"Error connecting to Weaviate: {e}")
         raise
+
+
+async def initialize_weaviate_async():
+    try:
+        connection_params = weaviate.connect.ConnectionParams.from_url(
+            url=WEAVIATE_URL, grpc_port=50051
+        )
+        client = weaviate.WeaviateAsyncClient(connection_params=connection_params)
+
+        max_attempts = 70
+        attempt = 1
+        while attempt <= max_attempts:
+            try:
+                await client.connect()
+            except:
+                pass
+            if await client.is_ready():
+                logger.info("Successfully connected to Weaviate (async)")
+                return client
+            logger.warning(f"Weaviate not ready, attempt {attempt}/{max_attempts}")
+            await asyncio.sleep(5)
+            attempt += 1
+
+        logger.error("Failed to connect to Weaviate after max attempts")
+        raise Exception("Weaviate connection failed")
+    except Exception as e:
+        logger.error(f"Error connecting to Weaviate: {e}")
+        raise
@@ -0,0 +1,246 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import weaviate
+from generation.cache import bucket_intervals, retrieval_cache
+from generation.embedding import query_embedder
+from generation.search import (
+    SEARCH_LIMIT,
+    SPECULATIVE_VECTOR_LIMIT,
+    _apply_temporal_boost,
+    _dense_query,
+    _distance_results,
+    _filter_speculative,
+    _fuse_scores,
+    _hybrid_query,
+    _hydrate_query,
+    _hydrated_results,
+    _log_timings,
+    _resolve_query_time,
+    _scored_results,
+    _sparse_query,
+)
+from processing.lemmatization import lemmatize_text
+from processing.time import aparse_with_duckling
+from weaviate.classes.query import Filter
+
+# Async counterpart of generation.search for the WeaviateAsyncClient. Request
+# building, result parsing and scoring are shared with the sync path; only
+# the I/O is awaited here.
+
+
+async def _atimed(awaitable):
+    start = time.perf_counter()
+    result = await awaitable
+    return result, time.perf_counter() - start
+
+
+async def _aembed(query: str) -> List[float]:
+    return await asyncio.to_thread(query_embedder.embed, query)
+
+
+async def _aparse_query_time(query: str, now: datetime):
+    temporal_points, temporal_intervals = await aparse_with_duckling(query)
+    return _resolve_query_time(temporal_points, temporal_intervals, now)
+
+
+async def _asearch_dense(
+    collection: weaviate.collections.CollectionAsync,
+    query: str,
+    filters: Optional[Filter],
+):
+    return _scored_results(await collection.query.bm25(**_dense_query(query, filters)))
+
+
+async def _asearch_sparse(
+    collection: weaviate.collections.CollectionAsync,
+    query: str,
+    filters: Optional[Filter],
+    limit: int = SEARCH_LIMIT,
+):
+    query_vector = await _aembed(query)
+    return _distance_results(
+        await collection.query.near_vector(
+            **_sparse_query(query_vector, filters, limit)
+        )
+    )
+
+
+async def _asearch_hybrid(
+    collection: weaviate.collections.CollectionAsync,
+    query: str,
+    lemmatized_query: str,
+    filters: Optional[Filter],
+    alpha: float,
+    fusion_type: str,
+):
+    query_vector = await _aembed(query)
+    return _scored_results(
+        await collection.query.hybrid(
+            **_hybrid_query(lemmatized_query, query_vector, filters, alpha, fusion_type)
+        )
+    )
+
+
+async def _ahydrate(
+    collection: weaviate.collections.CollectionAsync, results: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    if not results:
+        return []
+
+    response = await collection.query.fetch_objects_by_ids(**_hydrate_query(results))
+    return _hydrated_results(results, response)
+
+
+async def _aretrieve_fusion(
+    collection: weaviate.collections.CollectionAsync,
+    query: str,
+    lemmatized_query: str,
+    query_time: Tuple,
+    now: datetime,
+    timings: Dict[str, float],
+    vector_task: Optional[asyncio.Task] = None,
+) -> List[Dict[str, Any]]:
+    intervals, temporal_filters, temporal_points, temporal_intervals = query_time
+
+    dense_task = asyncio.create_task(
+        _atimed(_asearch_dense(collection, lemmatized_query, temporal_filters))
+    )
+
+    sparse_results = None
+    if vector_task is not None:
+        speculative_results, timings["vector"] = await vector_task
+        sparse_results = _filter_speculative(speculative_results, intervals)
+
+    if sparse_results is None:
+        sparse_results, timings["vector_filtered"] = await _atimed(
+            _asearch_sparse(collection, query, temporal_filters)
+        )
+
+    dense_results, timings["bm25"] = await dense_task
+
+    return _fuse_scores(
+        dense_results,
+        sparse_results,
+        temporal_intervals,
+        temporal_points,
+        now,
+        20,
+        temporal_boost=1.0,
+    )
+
+
+async def _aretrieve_hybrid(
+    collection: weaviate.collections.CollectionAsync,
+    query: str,
+    lemmatized_query: str,
+    query_time: Tuple,
+    now: datetime,
+    timings: Dict[str, float],
+    alpha: float,
+    fusion_type: str,
+) -> List[Dict[str, Any]]:
+    _, temporal_filters, temporal_points, temporal_intervals = query_time
+
+    hybrid_results, timings["hybrid"] = await _atimed(
+        _asearch_hybrid(
+            collection,
+            query,
+            lemmatized_query,
+            temporal_filters,
+            alpha,
+            fusion_type,
+        )
+    )
+
+    scores = {result["uuid"]: result["score"] for result in hybrid_results}
+    result_map = {result["uuid"]: result for result in hybrid_results}
+    return _apply_temporal_boost(
+        scores,
+        result_map,
+        temporal_intervals,
+        temporal_points,
+        now,
+        temporal_boost=1.0,
+    )
+
+
+async def asearch_weaviate(
+    client: weaviate.WeaviateAsyncClient,
+    query: str,
+    limit=10,
+    alpha=0.5,
+    mode: str = "fusion",
+    fusion_type: str = "relative_score",
+) -> List[Dict[str, Any]]:
+    """
+    Async version of search_weaviate with the same modes, cache and results.
+    """
+    start = time.perf_counter()
+    now = datetime.now(tz=ZoneInfo("Europe/Moscow"))
+    chunk_collection = client.collections.get("Chunk")
+    timings = {}
+
+    # Off the event loop: the lemmatizer may still be loading its dictionary.
+    lemmatized_query, timings["lemmatize"] = await _atimed(
+        asyncio.to_thread(lemmatize_text, query)
+    )
+    cache_prefix = (lemmatized_query, mode, alpha, fusion_type)
+
+    time_task = asyncio.create_task(_atimed(_aparse_query_time(query, now)))
+    vector_task = None
+    if mode == "fusion" and not retrieval_cache.contains_prefix(cache_prefix):
+        vector_task = asyncio.create_task(
+            _atimed(
+                _asearch_sparse(
+                    chunk_collection, query, None, limit=SPECULATIVE_VECTOR_LIMIT
+                )
+            )
+        )
+    query_time, timings["duckling"] = await time_task
+
+    cache_key = (
+        cache_prefix,
+        bucket_intervals(query_time[0], retrieval_cache.ttl),
+    )
+    fused_results = retrieval_cache.get(cache_key)
+    cache_status = "hit"
+    if fused_results is None:
+        cache_status = "miss"
+        if mode == "hybrid":
+            fused_results = await _aretrieve_hybrid(
+                chunk_collection,
+                query,
+                lemmatized_query,
+                query_time,
+                now,
+                timings,
+                alpha,
+                fusion_type,
+            )
+        else:
+            fused_results = await _aretrieve_fusion(
+                chunk_collection,
+                query,
+                lemmatized_query,
+                query_time,
+                now,
+                timings,
+                vector_task,
+            )
+
+        fused_results, timings["hydrate"] = await _atimed(
+            _ahydrate(chunk_collection, fused_results)
+        )
+
+        retrieval_cache.put(cache_key, fused_results)
+    elif vector_task is not None:
+        vector_task.cancel()
+
+    timings["total"] = time.perf_counter() - start
+    _log_timings(mode, cache_status, timings)
+
+    return fused_results
@@ -0,0 +1,242 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Hashable, List, Optional, Tuple
+
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", 1024))
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", 600))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1024))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH")
+# Expired and surplus rows of the SQLite answer cache are deleted once per
+# this many writes.
+ANSWER_CACHE_EVICT_EVERY = int(os.getenv("ANSWER_CACHE_EVICT_EVERY", 100))
+
+
+def bucket_intervals(
+    intervals: List[Tuple[datetime, datetime]], bucket_seconds: float
+) -> Tuple[Tuple[int, int], ...]:
+    """
+    Rounds resolved temporal intervals down to time buckets.
+
+    Relative expressions like "вчера" resolve to different absolute intervals
+    on different days, so they produce different keys, while the default
+    "last year" interval that ends at the current moment stays stable within
+    one bucket.
+    """
+    return tuple(
+        sorted(
+            (
+                int(start.timestamp() // bucket_seconds),
+                int(end.timestamp() // bucket_seconds),
+            )
+            for start, end in intervals
+        )
+    )
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiration.
+
+    Keys are (prefix, suffix) pairs; contains_prefix tells whether any live
+    entry shares a prefix, which lets callers skip speculative work for
+    queries that are likely to hit. All entries share one ttl, so they expire
+    in the order they were put and expired ones are purged from the front.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._prefixes: Counter = Counter()
+        self._expirations: deque = deque()
+        self._lock = threading.Lock()
+
+    def _evict(self, key: Tuple[Hashable, Hashable]):
+        del self._entries[key]
+        self._prefixes[key[0]] -= 1
+        if self._prefixes[key[0]] <= 0:
+            del self._prefixes[key[0]]
+
+    def _purge_expired(self, now: float):
+        while self._expirations and self._expirations[0][0] < now:
+            expires_at, key = self._expirations.popleft()
+            entry = self._entries.get(key)
+            # The key may have been evicted or put again since.
+            if entry is not None and entry[0] == expires_at:
+                self._evict(key)
+
+    def get(self, key: Tuple[Hashable, Hashable]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: Tuple[Hashable, Hashable], value: Any):
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            if key in self._entries:
+                self._evict(key)
+            expires_at = now + self.ttl
+            self._entries[key] = (expires_at, copy.deepcopy(value))
+            self._expirations.append((expires_at, key))
+            self._prefixes[key[0]] += 1
+            while len(self._entries) > self.maxsize:
+                self._evict(next(iter(self._entries)))
+
+    def contains_prefix(self, prefix: Hashable) -> bool:
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return prefix in self._prefixes
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._prefixes.clear()
+            self._expirations.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+class AnswerCache:
+    """
+    Cache of generated answers keyed by the normalized query and the ordered
+    UUIDs of the retrieved chunks.
+
+    Entries live in an in-memory TTLCache and, when a path is given, also in
+    a SQLite file, so they survive restarts. Every hit adds the latency of
+    the original LLM call to saved_seconds. The SQLite methods block, so
+    async callers run them in a thread.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._puts = 0
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # Losing the last writes on a crash is fine for a cache.
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, answer TEXT, latency REAL, expires_at REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS answers_expires_at ON answers (expires_at)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _key(query: str, chunk_ids: List[str]) -> Tuple[str, Tuple[str, ...]]:
+        return " ".join(query.casefold().split()), tuple(chunk_ids)
+
+    @staticmethod
+    def _db_key(key: Tuple[str, Tuple[str, ...]]) -> str:
+        return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode()).hexdigest()
+
+    def _db_get(self, key) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT answer, latency FROM answers WHERE key = ? AND expires_at > ?",
+                (self._db_key(key), time.time()),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def _db_put(self, key, answer: str, latency: float):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)",
+                (self._db_key(key), answer, latency, now + self.ttl),
+            )
+            self._puts += 1
+            if self._puts % ANSWER_CACHE_EVICT_EVERY == 0:
+                self._db.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+                self._db.execute(
+                    "DELETE FROM answers WHERE key IN (SELECT key FROM answers "
+                    "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                )
+            self._db.commit()
+
+    def get(self, query: str, chunk_ids: List[str]) -> Optional[str]:
+        key = self._key(query, chunk_ids)
+        entry = self._memory.get(key)
+        if entry is None and self._db is not None:
+            entry = self._db_get(key)
+            if entry is not None:
+                self._memory.put(key, entry)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += entry[1]
+        return entry[0]
+
+    def put(self, query: str, chunk_ids: List[str], answer: str, latency: float):
+        key = self._key(query, chunk_ids)
+        self._memory.put(key, (answer, latency))
+        if self._db is not None:
+            self._db_put(key, answer, latency)
+
+    def invalidate(self):
+        self._memory.invalidate()
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM answers")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": self._memory.stats()["size"],
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "saved_llm_seconds": self.saved_seconds,
+            }
+
+
+retrieval_cache = TTLCache(maxsize=RETRIEVAL_CACHE_SIZE, ttl=RETRIEVAL_CACHE_TTL)
+answer_cache = AnswerCache(
+    maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL, path=ANSWER_CACHE_PATH
+)
@@ -0,0 +1,85 @@
+import logging
+import math
+import os
+import re
+from typing import Any, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 2000))
+CONTEXT_CHARS_PER_TOKEN = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", 3.0))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", 0.8))
+SHINGLE_SIZE = 3
+# URL and date lines added by build_prompt for every news item.
+HEADER_TOKENS = 30
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for Russian text, without a GigaChat tokenizer call.
+    """
+    return math.ceil(len(text) / CONTEXT_CHARS_PER_TOKEN)
+
+
+def _shingles(text: str) -> Set[tuple]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)}
+    return {
+        tuple(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def _similarity(a: Set[tuple], b: Set[tuple]) -> float:
+    """
+    Share of the smaller shingle set found in the other one, so a short
+    repost contained in a longer article also counts as a duplicate.
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def pack_context(
+    context_chunks: List[Dict[str, Any]],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    dedup_threshold: float = CONTEXT_DEDUP_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Packs retrieved chunks into the prompt context.
+
+    Chunks are taken in score order; near-duplicates of an already taken
+    chunk are dropped, chunks that do not fit into the token budget are
+    skipped, and chunks of the same news item are merged into one entry
+    that keeps the position and score of its best chunk.
+    """
+    packed: Dict[str, Dict[str, Any]] = {}
+    taken_shingles: List[Set[tuple]] = []
+    used_tokens = 0
+
+    for chunk in sorted(context_chunks, key=lambda c: c["score"], reverse=True):
+        shingles = _shingles(chunk["content"])
+        if any(
+            _similarity(shingles, taken) >= dedup_threshold for taken in taken_shingles
+        ):
+            continue
+
+        tokens = estimate_tokens(chunk["content"])
+        if chunk["news_url"] not in packed:
+            tokens += HEADER_TOKENS
+        if used_tokens + tokens > token_budget:
+            continue
+
+        taken_shingles.append(shingles)
+        used_tokens += tokens
+        entry = packed.get(chunk["news_url"])
+        if entry is None:
+            packed[chunk["news_url"]] = {**chunk}
+        else:
+            entry["content"] = f"{entry["content"]}\n{chunk["content"]}"
+
+    logger.debug(
+        f"Packed {len(context_chunks)} chunks into {len(packed)} entries, "
+        f"~{used_tokens} tokens"
+    )
+    return list(packed.values())
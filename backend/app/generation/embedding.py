@@ -0,0 +1,100 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Protocol
+
+import numpy as np
+import requests
+
+EMBEDDER = os.getenv("EMBEDDER", "transformers")
+T2V_URL = os.getenv("T2V_URL", "http://localhost:9090")
+T2V_TIMEOUT = float(os.getenv("T2V_TIMEOUT", 10))
+T2V_POOLING_STRATEGY = "cls"
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 4096))
+HASHING_EMBEDDER_DIM = 768
+
+
+class Embedder(Protocol):
+    def embed(self, text: str) -> List[float]: ...
+
+
+class TransformersEmbedder:
+    """
+    Client for the t2v-transformers inference container used by Weaviate.
+
+    Uses the same pooling strategy as the Chunk vectorizer, so query vectors
+    match the ones Weaviate computes for near_text.
+    """
+
+    def __init__(self, url: str = T2V_URL, timeout: float = T2V_TIMEOUT):
+        self.url = f"{url}/vectors"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def embed(self, text: str) -> List[float]:
+        response = self.session.post(
+            self.url,
+            json={"text": text, "config": {"pooling_strategy": T2V_POOLING_STRATEGY}},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["vector"]
+
+
+class HashingEmbedder:
+    """
+    Local stand-in embedder for tests and development without the model.
+
+    Hashes tokens into a fixed number of buckets, so equal texts get equal
+    vectors and texts sharing words get similar ones.
+    """
+
+    def __init__(self, dim: int = HASHING_EMBEDDER_DIM):
+        self.dim = dim
+
+    def embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest, "little")
+            vector[bucket % self.dim] += 1.0 if bucket & (1 << 63) else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+
+class CachedEmbedder:
+    """
+    Wraps an embedder with a bounded LRU cache keyed by normalized text.
+    """
+
+    def __init__(self, embedder: Embedder, cache_size: int = EMBEDDING_CACHE_SIZE):
+        self.embedder = embedder
+        self._embed_normalized = lru_cache(maxsize=cache_size)(self._embed)
+
+    def _embed(self, text: str) -> tuple:
+        return tuple(self.embedder.embed(text))
+
+    def embed(self, text: str) -> List[float]:
+        return list(self._embed_normalized(" ".join(text.split())))
+
+    def stats(self) -> Dict[str, float]:
+        info = self._embed_normalized.cache_info()
+        requests_count = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / requests_count if requests_count else 0.0,
+        }
+
+
+EMBEDDERS = {
+    "transformers": TransformersEmbedder,
+    "hashing": HashingEmbedder,
+}
+
+query_embedder = CachedEmbedder(EMBEDDERS[EMBEDDER]())
@@ -1,4 +1,5 @@
 import os
+from typing import AsyncIterator, Iterator
 
 from langchain_community.chat_models import GigaChat
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -68,3 +69,26 @@ def generate(prompt: str) -> str:
     messages.append(HumanMessage(content=prompt))
     response = giga.invoke(messages)
     return response.content
+
+
+async def agenerate(prompt: str) -> str:
+    messages = [system_message]
+    messages.append(HumanMessage(content=prompt))
+    response = await giga.ainvoke(messages)
+    return response.content
+
+
+def stream_generate(prompt: str) -> Iterator[str]:
+    messages = [system_message]
+    messages.append(HumanMessage(content=prompt))
+    for chunk in giga.stream(messages):
+        if chunk.content:
+            yield chunk.content
+
+
+async def astream_generate(prompt: str) -> AsyncIterator[str]:
+    messages = [system_message]
+    messages.append(HumanMessage(content=prompt))
+    async for chunk in giga.astream(messages):
+        if chunk.content:
+            yield chunk.content
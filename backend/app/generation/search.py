@@ -1,12 +1,36 @@
+import logging
+import os
+import time
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import weaviate
+from generation.cache import bucket_intervals, retrieval_cache
+from generation.embedding import query_embedder
 from processing.lemmatization import lemmatize_text
 from processing.time import parse_with_duckling
-from weaviate.classes.query import Filter, MetadataQuery, QueryReference
+from weaviate.classes.query import (
+    Filter,
+    HybridFusion,
+    MetadataQuery,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_LIMIT = 20
+SPECULATIVE_VECTOR_LIMIT = int(os.getenv("SPECULATIVE_VECTOR_LIMIT", 60))
+SCORING_PROPERTIES = ["date"]
+HYDRATED_PROPERTIES = ["content", "url"]
+HYBRID_FUSION_TYPES = {
+    "relative_score": HybridFusion.RELATIVE_SCORE,
+    "ranked": HybridFusion.RANKED,
+}
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("RETRIEVAL_WORKERS", 16)))
 
 
 def point_to_interval(point: datetime, grain: str) -> Tuple[datetime, datetime]:
@@ -29,112 +53,206 @@ def _to_datetime(date: str):
     return datetime.fromisoformat(date).replace(tzinfo=ZoneInfo("Europe/Moscow"))
 
 
-def _calculate_temporal_score(
+def _to_epoch(times: List[datetime]) -> np.ndarray:
+    return np.array([time.timestamp() for time in times], dtype=np.float64)
+
+
+def _calculate_temporal_scores(
     query_intervals: List[Tuple[datetime]],
     query_points: List[datetime],
     query_date: datetime,
-    chunk_intervals: List[Tuple[datetime]],
-    chunk_points: List[datetime],
-    chunk_date: datetime,
-    gamma=0.2,
-):
-    temporal_score = 0.0
-
-    reference_times = [query_date]
-    if query_intervals:
-        for start, end in query_intervals:
-            midpoint = start + (end - start) / 2
-            reference_times.append(midpoint)
-    if query_points:
-        reference_times.extend(query_points)
-
-    durations = (
-        [(end - start).total_seconds() for start, end in query_intervals]
-        if query_intervals
-        else []
+    chunks_intervals: List[List[Tuple[datetime]]],
+    chunks_points: List[List[datetime]],
+    chunk_dates: List[datetime],
+) -> np.ndarray:
+    """
+    Scores all candidate chunks against the query's temporal references at once.
+
+    Every datetime is converted to epoch seconds; the per-chunk points and
+    intervals are flattened and mapped back to their chunk by index, so
+    distances and interval overlaps are computed with broadcasting.
+    """
+    n_chunks = len(chunk_dates)
+    temporal_scores = np.zeros(n_chunks, dtype=np.float64)
+    if n_chunks == 0:
+        return temporal_scores
+
+    query_starts = _to_epoch([start for start, _ in query_intervals])
+    query_ends = _to_epoch([end for _, end in query_intervals])
+
+    reference_times = np.concatenate(
+        [
+            _to_epoch([query_date]),
+            query_starts + (query_ends - query_starts) / 2,
+            _to_epoch(query_points),
+        ]
     )
-    max_duration = max(durations + [367 * 86400], default=367 * 86400)
-
-    point_score = 0.0
-    all_points = chunk_points + [chunk_date]
-    max_point_score = 0.0
-    for point in all_points:
-        min_distance = min(
-            abs((point - ref).total_seconds()) for ref in reference_times
-        )
-        point_score = max(0.0, 1.0 - min_distance / (max_duration * 2))
-        max_point_score = max(max_point_score, point_score)
-    temporal_score += max_point_score * 0.5
-
-    interval_score = 0.0
-    if chunk_intervals and query_intervals:
-        max_overlap_score = 0.0
-        for c_start, c_end in chunk_intervals:
-            for q_start, q_end in query_intervals:
-                intersect_start = max(c_start, q_start)
-                intersect_end = min(c_end, q_end)
-                intersection = max(0, (intersect_end - intersect_start).total_seconds())
-                union = (max(c_end, q_end) - min(c_start, q_start)).total_seconds()
-                overlap_score = intersection / union if union > 0 else 0.0
-                max_overlap_score = max(max_overlap_score, overlap_score)
-        interval_score = max_overlap_score
-        temporal_score += interval_score * 0.5
-    print(temporal_score)
-
-    return temporal_score
+    max_duration = max(np.max(query_ends - query_starts, initial=0.0), 367 * 86400)
+
+    points = []
+    point_owners = []
+    for i, (chunk_points, chunk_date) in enumerate(zip(chunks_points, chunk_dates)):
+        points.extend(chunk_points)
+        points.append(chunk_date)
+        point_owners.extend([i] * (len(chunk_points) + 1))
+    point_owners = np.array(point_owners, dtype=np.intp)
+
+    min_distances = np.min(
+        np.abs(_to_epoch(points)[:, None] - reference_times[None, :]), axis=1
+    )
+    point_scores = np.maximum(0.0, 1.0 - min_distances / (max_duration * 2))
+    max_point_scores = np.zeros(n_chunks, dtype=np.float64)
+    np.maximum.at(max_point_scores, point_owners, point_scores)
+    temporal_scores += max_point_scores * 0.5
+
+    if len(query_intervals) == 0:
+        return temporal_scores
+
+    chunk_starts = []
+    chunk_ends = []
+    interval_owners = []
+    for i, chunk_intervals in enumerate(chunks_intervals):
+        for start, end in chunk_intervals:
+            chunk_starts.append(start)
+            chunk_ends.append(end)
+            interval_owners.append(i)
+    if not interval_owners:
+        return temporal_scores
+    interval_owners = np.array(interval_owners, dtype=np.intp)
+
+    chunk_starts = _to_epoch(chunk_starts)[:, None]
+    chunk_ends = _to_epoch(chunk_ends)[:, None]
+    intersection = np.maximum(
+        0.0,
+        np.minimum(chunk_ends, query_ends[None, :])
+        - np.maximum(chunk_starts, query_starts[None, :]),
+    )
+    union = np.maximum(chunk_ends, query_ends[None, :]) - np.minimum(
+        chunk_starts, query_starts[None, :]
+    )
+    overlap_scores = np.divide(
+        intersection, union, out=np.zeros_like(intersection), where=union > 0
+    )
+    max_overlap_scores = np.zeros(n_chunks, dtype=np.float64)
+    np.maximum.at(max_overlap_scores, interval_owners, overlap_scores.max(axis=1))
+    temporal_scores += max_overlap_scores * 0.5
 
+    return temporal_scores
 
-def _search_dense(
-    collection: weaviate.collections.Collection, query: str, filters: Filter
-):
-    bm25_response = collection.query.bm25(
+
+def _dense_query(
+    query: str, filters: Optional[Filter], limit: int = SEARCH_LIMIT
+) -> Dict[str, Any]:
+    return dict(
         query=query,
         query_properties=["lemmatized_content", "lemmatized_keywords^2"],
         return_metadata=MetadataQuery(score=True),
-        return_references=QueryReference(link_on="news"),
+        return_properties=SCORING_PROPERTIES,
+        filters=filters,
+        limit=limit,
+    )
+
+
+def _sparse_query(
+    query_vector: List[float], filters: Optional[Filter], limit: int = SEARCH_LIMIT
+) -> Dict[str, Any]:
+    return dict(
+        near_vector=query_vector,
+        return_metadata=MetadataQuery(score=True, distance=True),
+        return_properties=SCORING_PROPERTIES,
+        filters=filters,
+        limit=limit,
+    )
+
+
+def _hybrid_query(
+    lemmatized_query: str,
+    query_vector: List[float],
+    filters: Optional[Filter],
+    alpha: float,
+    fusion_type: str,
+    limit: int = SEARCH_LIMIT,
+) -> Dict[str, Any]:
+    return dict(
+        query=lemmatized_query,
+        vector=query_vector,
+        query_properties=["lemmatized_content", "lemmatized_keywords^2"],
+        alpha=alpha,
+        fusion_type=HYBRID_FUSION_TYPES[fusion_type],
+        return_metadata=MetadataQuery(score=True),
+        return_properties=SCORING_PROPERTIES,
         filters=filters,
-        limit=20,
+        limit=limit,
     )
 
-    bm25_results = []
-    for obj in bm25_response.objects:
-        bm25_results.append(
+
+def _scored_results(response) -> List[Dict[str, Any]]:
+    results = []
+    for obj in response.objects:
+        results.append(
             {
                 "uuid": obj.uuid,
-                "content": obj.properties["content"],
                 "score": obj.metadata.score,
-                "news_url": obj.references["news"].objects[0].properties["url"],
-                "date": obj.references["news"].objects[0].properties["date"],
+                "date": obj.properties["date"],
             }
         )
 
-    return bm25_results
+    return results
 
 
-def _search_sparse(
-    collection: weaviate.collections.Collection, query: str, filters: Filter
-):
-    vector_response = collection.query.near_text(
-        query=query,
-        return_metadata=MetadataQuery(score=True, distance=True),
-        return_references=QueryReference(link_on="news"),
-        filters=filters,
-        limit=20,
-    )
-
-    vector_results = []
-    for obj in vector_response.objects:
-        vector_results.append(
+def _distance_results(response) -> List[Dict[str, Any]]:
+    results = []
+    for obj in response.objects:
+        results.append(
             {
                 "uuid": obj.uuid,
-                "content": obj.properties["content"],
                 "distance": obj.metadata.distance,
-                "news_url": obj.references["news"].objects[0].properties["url"],
-                "date": obj.references["news"].objects[0].properties["date"],
+                # Unfiltered searches can return chunks without a date yet.
+                "date": obj.properties.get("date"),
             }
         )
 
-    return vector_results
+    return results
+
+
+def _search_dense(
+    collection: weaviate.collections.Collection,
+    query: str,
+    filters: Optional[Filter],
+    limit: int = SEARCH_LIMIT,
+):
+    return _scored_results(collection.query.bm25(**_dense_query(query, filters, limit)))
+
+
+def _search_sparse(
+    collection: weaviate.collections.Collection,
+    query: str,
+    filters: Optional[Filter],
+    limit: int = SEARCH_LIMIT,
+):
+    query_vector = query_embedder.embed(query)
+    return _distance_results(
+        collection.query.near_vector(**_sparse_query(query_vector, filters, limit))
+    )
+
+
+def _search_hybrid(
+    collection: weaviate.collections.Collection,
+    query: str,
+    lemmatized_query: str,
+    filters: Optional[Filter],
+    alpha: float,
+    fusion_type: str,
+    limit: int = SEARCH_LIMIT,
+):
+    query_vector = query_embedder.embed(query)
+    return _scored_results(
+        collection.query.hybrid(
+            **_hybrid_query(
+                lemmatized_query, query_vector, filters, alpha, fusion_type, limit
+            )
+        )
+    )
 
 
 def _fuse_scores(
@@ -150,14 +268,9 @@ def _fuse_scores(
     result_map = {}
 
     for result in bm25_results + vector_results:
-        result_map[result["uuid"]] = {
-            "content": result["content"],
-            "news_url": result["news_url"],
-            "date": result["date"],
-        }
+        result_map[result["uuid"]] = {"date": result["date"]}
 
     for rank, result in enumerate(bm25_results):
-        print(f"score: {bm25_results[rank]["score"]}")
         scores[result["uuid"]] += (
             (1 - vector_results[-1]["distance"])
             * bm25_results[rank]["score"]
@@ -165,44 +278,38 @@ def _fuse_scores(
         )
 
     for rank, result in enumerate(vector_results):
-        print(f"distance: {vector_results[rank]["distance"]}")
         scores[result["uuid"]] += 1 - vector_results[rank]["distance"]
 
-    boosted_scores = {}
-    for uuid, score in scores.items():
-        result = result_map[uuid]
-        # try:
-        #     chunk_date = datetime.fromisoformat(result["date"]).replace(
-        #         tzinfo=ZoneInfo("Europe/Moscow")
-        #     )
-        # except ValueError:
-        #     chunk_date = datetime.now(tz=ZoneInfo("Europe/Moscow"))
-
-        chunk_date = result["date"]
-        chunk_intervals: List[Tuple[datetime]] = []
-        chunk_points: List[datetime] = []
-
-        temporal_score = _calculate_temporal_score(
-            query_intervals=query_intervals,
-            query_points=query_points,
-            query_date=query_date,
-            chunk_intervals=chunk_intervals,
-            chunk_points=chunk_points,
-            chunk_date=chunk_date,
-            gamma=0.2,
-        )
+    return _apply_temporal_boost(
+        scores, result_map, query_intervals, query_points, query_date, temporal_boost
+    )
+
+
+def _apply_temporal_boost(
+    scores: Dict[Any, float],
+    result_map: Dict[Any, Dict[str, Any]],
+    query_intervals: List[Tuple[datetime]],
+    query_points: List[datetime],
+    query_date: datetime,
+    temporal_boost: float = 1.0,
+) -> List[Dict[str, Any]]:
+    uuids = list(scores.keys())
+    temporal_scores = _calculate_temporal_scores(
+        query_intervals=query_intervals,
+        query_points=query_points,
+        query_date=query_date,
+        chunks_intervals=[[] for _ in uuids],
+        chunks_points=[[] for _ in uuids],
+        chunk_dates=[result_map[uuid]["date"] for uuid in uuids],
+    )
 
-        boosted_score = score * (1.0 + temporal_boost * temporal_score)
-        boosted_scores[uuid] = boosted_score
+    boosted_scores = {
+        uuid: scores[uuid] * (1.0 + temporal_boost * temporal_score)
+        for uuid, temporal_score in zip(uuids, temporal_scores.tolist())
+    }
 
     combined_results = [
-        {
-            "uuid": uuid.hex,
-            "content": result_map[uuid]["content"],
-            "score": score,
-            "news_url": result_map[uuid]["news_url"],
-            "date": result_map[uuid]["date"],
-        }
+        {"uuid": uuid, "score": score, "date": result_map[uuid]["date"]}
         for uuid, score in sorted(
             boosted_scores.items(), key=lambda x: x[1], reverse=True
         )
@@ -211,16 +318,63 @@ def _fuse_scores(
     return combined_results[:10]
 
 
-def search_weaviate(
-    client: weaviate.Client, query: str, limit=10, alpha=0.5
+def _hydrate_query(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return dict(
+        ids=[result["uuid"] for result in results],
+        return_properties=HYDRATED_PROPERTIES,
+        limit=len(results),
+    )
+
+
+def _hydrated_results(results: List[Dict[str, Any]], response) -> List[Dict[str, Any]]:
+    properties = {obj.uuid: obj.properties for obj in response.objects}
+
+    return [
+        {
+            "uuid": result["uuid"].hex,
+            "content": properties[result["uuid"]]["content"],
+            "score": result["score"],
+            "news_url": properties[result["uuid"]]["url"],
+            "date": result["date"].strftime("%Y.%m.%d"),
+        }
+        for result in results
+        if result["uuid"] in properties
+    ]
+
+
+def _hydrate(
+    collection: weaviate.collections.Collection, results: List[Dict[str, Any]]
 ) -> List[Dict[str, Any]]:
-    now = datetime.now(tz=ZoneInfo("Europe/Moscow"))
+    """
+    Fetches content and URL for the final top-k chunks in one request.
+
+    Retrieval queries only return the properties needed for scoring, so the
+    heavy ones are loaded for the few chunks that survive fusion.
+    """
+    if not results:
+        return []
+
+    response = collection.query.fetch_objects_by_ids(**_hydrate_query(results))
+    return _hydrated_results(results, response)
 
-    lemmatized_query = lemmatize_text(query)
+
+def _parse_query_time(query: str, now: datetime):
     temporal_points, temporal_intervals = parse_with_duckling(query)
+    return _resolve_query_time(temporal_points, temporal_intervals, now)
+
 
-    temporal_filters = []
-    intervals = temporal_intervals + [
+def _resolve_query_time(
+    temporal_points: List[Dict[str, Any]],
+    temporal_intervals: List[Dict[str, Any]],
+    now: datetime,
+):
+    intervals = [
+        (
+            datetime.fromisoformat(temporal_interval["start"]),
+            datetime.fromisoformat(temporal_interval["end"]),
+        )
+        for temporal_interval in temporal_intervals
+    ] + [
         point_to_interval(
             datetime.fromisoformat(temporal_point["point"]), temporal_point["grain"]
         )
@@ -228,20 +382,18 @@ def search_weaviate(
     ]
     if not intervals:
         intervals.append((now - timedelta(days=365), now))
-    for interval in intervals:
-        temporal_filters.append(
+
+    temporal_filters = Filter.any_of(
+        [
             Filter.all_of(
                 [
-                    Filter.by_ref("news")
-                    .by_property("date")
-                    .greater_or_equal(interval[0]),
-                    Filter.by_ref("news")
-                    .by_property("date")
-                    .less_or_equal(interval[1]),
+                    Filter.by_property("date").greater_or_equal(interval[0]),
+                    Filter.by_property("date").less_or_equal(interval[1]),
                 ]
             )
-        )
-    temporal_filters = Filter.any_of(temporal_filters)
+            for interval in intervals
+        ]
+    )
 
     temporal_points = [_to_datetime(point["point"]) for point in temporal_points]
     temporal_intervals = [
@@ -249,15 +401,95 @@ def search_weaviate(
         for interval in temporal_intervals
     ]
 
-    chunk_collection = client.collections.get("Chunk")
-
-    dense_results = _search_dense(
-        collection=chunk_collection, query=lemmatized_query, filters=temporal_filters
+    return intervals, temporal_filters, temporal_points, temporal_intervals
+
+
+def _in_intervals(date: datetime, intervals: List[Tuple[datetime]]) -> bool:
+    return any(start <= date <= end for start, end in intervals)
+
+
+def _filter_speculative(
+    speculative_results: List[Dict[str, Any]], intervals: List[Tuple[datetime]]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Applies the temporal filter to unfiltered vector results locally; results
+    without a date are dropped, as the Weaviate filter would do.
+
+    Returns None when a full speculative page leaves fewer than SEARCH_LIMIT
+    candidates, meaning the filtered vector search has to be repeated.
+    """
+    sparse_results = [
+        result
+        for result in speculative_results
+        if result["date"] is not None and _in_intervals(result["date"], intervals)
+    ][:SEARCH_LIMIT]
+    if (
+        len(sparse_results) < SEARCH_LIMIT
+        and len(speculative_results) == SPECULATIVE_VECTOR_LIMIT
+    ):
+        return None
+    return sparse_results
+
+
+def _log_timings(mode: str, cache_status: str, timings: Dict[str, float]):
+    logger.info(
+        f"Retrieval timings ({mode}, cache {cache_status}): "
+        + ", ".join(
+            f"{name}={elapsed * 1000:.1f}ms" for name, elapsed in timings.items()
+        )
     )
-    sparse_results = _search_sparse(
-        collection=chunk_collection, query=query, filters=temporal_filters
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _retrieve_fusion(
+    collection: weaviate.collections.Collection,
+    query: str,
+    lemmatized_query: str,
+    query_time: Tuple,
+    now: datetime,
+    timings: Dict[str, float],
+    vector_future: Optional[Future] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Runs BM25 and vector retrieval concurrently and fuses them in Python.
+
+    vector_future is a speculative unfiltered vector search started together
+    with the Duckling call; its results are filtered locally and the filtered
+    vector search is only repeated if fewer than SEARCH_LIMIT candidates
+    remain. Without it, the filtered vector search runs alongside BM25.
+    """
+    intervals, temporal_filters, temporal_points, temporal_intervals = query_time
+
+    dense_future = _executor.submit(
+        _timed,
+        _search_dense,
+        collection=collection,
+        query=lemmatized_query,
+        filters=temporal_filters,
     )
-    fused_results = _fuse_scores(
+
+    if vector_future is not None:
+        speculative_results, timings["vector"] = vector_future.result()
+        sparse_results = _filter_speculative(speculative_results, intervals)
+    else:
+        sparse_results = None
+
+    if sparse_results is None:
+        sparse_results, timings["vector_filtered"] = _timed(
+            _search_sparse,
+            collection=collection,
+            query=query,
+            filters=temporal_filters,
+        )
+
+    dense_results, timings["bm25"] = dense_future.result()
+
+    return _fuse_scores(
         dense_results,
         sparse_results,
         temporal_intervals,
@@ -267,7 +499,121 @@ def search_weaviate(
         temporal_boost=1.0,
     )
 
-    for i in range(len(fused_results)):
-        fused_results[i]["date"] = fused_results[i]["date"].strftime("%Y.%m.%d")
+
+def _retrieve_hybrid(
+    collection: weaviate.collections.Collection,
+    query: str,
+    lemmatized_query: str,
+    query_time: Tuple,
+    now: datetime,
+    timings: Dict[str, float],
+    alpha: float,
+    fusion_type: str,
+) -> List[Dict[str, Any]]:
+    """
+    Retrieves candidates with a single Weaviate hybrid query.
+
+    BM25 runs on the lemmatized query and the vector part on the embedded
+    raw query, fused server-side; the result goes through the same temporal
+    boost.
+    """
+    _, temporal_filters, temporal_points, temporal_intervals = query_time
+
+    hybrid_results, timings["hybrid"] = _timed(
+        _search_hybrid,
+        collection=collection,
+        query=query,
+        lemmatized_query=lemmatized_query,
+        filters=temporal_filters,
+        alpha=alpha,
+        fusion_type=fusion_type,
+    )
+
+    scores = {result["uuid"]: result["score"] for result in hybrid_results}
+    result_map = {result["uuid"]: result for result in hybrid_results}
+    return _apply_temporal_boost(
+        scores,
+        result_map,
+        temporal_intervals,
+        temporal_points,
+        now,
+        temporal_boost=1.0,
+    )
+
+
+def search_weaviate(
+    client: weaviate.Client,
+    query: str,
+    limit=10,
+    alpha=0.5,
+    mode: str = "fusion",
+    fusion_type: str = "relative_score",
+) -> List[Dict[str, Any]]:
+    """
+    Retrieves context chunks for the query.
+
+    mode="fusion" runs separate BM25 and vector queries fused in Python,
+    mode="hybrid" issues one Weaviate hybrid query with the given alpha and
+    fusion_type. Results are cached by the lemmatized query and the resolved
+    temporal intervals. Per-branch timings are logged for every request.
+    """
+    start = time.perf_counter()
+    now = datetime.now(tz=ZoneInfo("Europe/Moscow"))
+    chunk_collection = client.collections.get("Chunk")
+    timings = {}
+
+    lemmatized_query, timings["lemmatize"] = _timed(lemmatize_text, query)
+    cache_prefix = (lemmatized_query, mode, alpha, fusion_type)
+
+    time_future = _executor.submit(_timed, _parse_query_time, query, now)
+    vector_future = None
+    if mode == "fusion" and not retrieval_cache.contains_prefix(cache_prefix):
+        vector_future = _executor.submit(
+            _timed,
+            _search_sparse,
+            collection=chunk_collection,
+            query=query,
+            filters=None,
+            limit=SPECULATIVE_VECTOR_LIMIT,
+        )
+    query_time, timings["duckling"] = time_future.result()
+
+    cache_key = (
+        cache_prefix,
+        bucket_intervals(query_time[0], retrieval_cache.ttl),
+    )
+    fused_results = retrieval_cache.get(cache_key)
+    cache_status = "hit"
+    if fused_results is None:
+        cache_status = "miss"
+        if mode == "hybrid":
+            fused_results = _retrieve_hybrid(
+                chunk_collection,
+                query,
+                lemmatized_query,
+                query_time,
+                now,
+                timings,
+                alpha,
+                fusion_type,
+            )
+        else:
+            fused_results = _retrieve_fusion(
+                chunk_collection,
+                query,
+                lemmatized_query,
+                query_time,
+                now,
+                timings,
+                vector_future,
+            )
+
+        fused_results, timings["hydrate"] = _timed(
+            _hydrate, chunk_collection, fused_results
+        )
+        retrieval_cache.put(cache_key, fused_results)
+
+    timings["total"] = time.perf_counter() - start
+    _log_timings(mode, cache_status, timings)
 
     return fused_results
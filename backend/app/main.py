@@ -1,6 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from processing import is_warm, start_warmup
+from router.generate import close_clients, connect_weaviate
 from router.generate import router as generate_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs while the server starts listening; /ready reports when it is done.
+    warmup_task = start_warmup(keywords=False)
+    await connect_weaviate()
+    try:
+        yield
+    finally:
+        # A failed warmup has already been logged.
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await close_clients()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(generate_router, prefix="/api")
+
+
+@app.get("/ready")
+def ready():
+    if not is_warm():
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return JSONResponse(content={"status": "ready"})
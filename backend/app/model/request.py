@@ -1,5 +1,10 @@
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 
 class TextRequest(BaseModel):
     text: str
+    mode: Literal["fusion", "hybrid"] = "fusion"
+    alpha: float = Field(0.5, ge=0.0, le=1.0)
+    fusion_type: Literal["relative_score", "ranked"] = "relative_score"
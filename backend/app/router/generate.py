@@ -1,53 +1,212 @@
-from database.connection import initialize_weaviate
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator
+
+from database.connection import initialize_weaviate, initialize_weaviate_async
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from generation.gigachat import generate
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from generation.async_search import asearch_weaviate
+from generation.cache import answer_cache, retrieval_cache
+from generation.context import pack_context
+from generation.embedding import query_embedder
+from generation.gigachat import (
+    agenerate,
+    astream_generate,
+    generate,
+    stream_generate,
+)
 from generation.search import search_weaviate
 from model.request import TextRequest
+from processing.lemmatization import lemmatizer
+from processing.time import duckling
+
+# The async pipeline uses the async Weaviate client, async Duckling requests
+# and GigaChat.ainvoke. With ASYNC_PIPELINE=false the blocking versions run
+# in the threadpool instead.
+ASYNC_PIPELINE = os.getenv("ASYNC_PIPELINE", "true").lower() == "true"
 
-client = initialize_weaviate()
+logger = logging.getLogger(__name__)
+
+client = None
 router = APIRouter()
 
 
-@router.post("/retrieve")
-async def retrieve(request: TextRequest):
-    context_chunks = search_weaviate(client, request.text)
-    return JSONResponse(content={"context": context_chunks})
+async def connect_weaviate():
+    global client
+    if ASYNC_PIPELINE:
+        client = await initialize_weaviate_async()
+    else:
+        client = await run_in_threadpool(initialize_weaviate)
 
 
-@router.post("/generate_response")
-async def generate_response(request: TextRequest):
-    context_chunks = search_weaviate(client, request.text)
-    print(context_chunks)
+async def close_clients():
+    await duckling.aclose()
+    if client is None:
+        return
+    if ASYNC_PIPELINE:
+        await client.close()
+    else:
+        client.close()
+
+
+async def search(request: TextRequest):
+    if ASYNC_PIPELINE:
+        return await asearch_weaviate(
+            client,
+            request.text,
+            alpha=request.alpha,
+            mode=request.mode,
+            fusion_type=request.fusion_type,
+        )
+    return await run_in_threadpool(
+        search_weaviate,
+        client,
+        request.text,
+        alpha=request.alpha,
+        mode=request.mode,
+        fusion_type=request.fusion_type,
+    )
+
+
+async def llm_generate(prompt: str) -> str:
+    if ASYNC_PIPELINE:
+        return await agenerate(prompt)
+    return await run_in_threadpool(generate, prompt)
+
+
+def build_prompt(context_chunks, query: str) -> str:
     context = ""
     if context_chunks:
         context = "\n".join(
             [
                 f"{chunk["content"]}\nURL для встраивания в ответ: {chunk["news_url"]}\nДата публикации: {chunk["date"]}"
-                for chunk in context_chunks
+                for chunk in pack_context(context_chunks)
             ]
         )
 
-    prompt = f"Контекст: \n{context}\n\n Запрос: {request.text}"
+    return f"Контекст: \n{context}\n\n Запрос: {query}"
+
+
+async def llm_stream(prompt: str) -> AsyncIterator[str]:
+    if ASYNC_PIPELINE:
+        async for delta in astream_generate(prompt):
+            yield delta
+    else:
+        async for delta in iterate_in_threadpool(stream_generate(prompt)):
+            yield delta
+
+
+def chunk_ids(context_chunks) -> list:
+    return [chunk["uuid"] for chunk in context_chunks]
+
+
+async def cached_generate(context_chunks, query: str) -> str:
+    """
+    Returns the cached answer for the query and the exact ordered context,
+    or generates it and caches it together with the LLM latency.
+    """
+    ids = chunk_ids(context_chunks)
+    # The answer cache may read and write its SQLite file.
+    response = await run_in_threadpool(answer_cache.get, query, ids)
+    if response is not None:
+        return response
+
+    start = time.perf_counter()
+    response = await llm_generate(build_prompt(context_chunks, query))
+    await run_in_threadpool(
+        answer_cache.put, query, ids, response, time.perf_counter() - start
+    )
+    return response
+
+
+def sse_event(data: dict, event: str = "message") -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-    response = generate(prompt)
+
+@router.post("/retrieve")
+async def retrieve(request: TextRequest):
+    context_chunks = await search(request)
+    return JSONResponse(content={"context": context_chunks})
+
+
+@router.post("/generate_response")
+async def generate_response(request: TextRequest):
+    context_chunks = await search(request)
+    print(context_chunks)
+    response = await cached_generate(context_chunks, request.text)
     return JSONResponse(content={"message": response})
 
 
 @router.post("/generate_with_context")
 async def generate_response(request: TextRequest):
-    context_chunks = search_weaviate(client, request.text)
+    context_chunks = await search(request)
     print(context_chunks)
-    context = ""
-    if context_chunks:
-        context = "\n".join(
-            [
-                f"{chunk["content"]}\nURL для встраивания в ответ: {chunk["news_url"]}\nДата публикации: {chunk["date"]}"
-                for chunk in context_chunks
-            ]
+    response = await cached_generate(context_chunks, request.text)
+    return JSONResponse(content={"message": response, "context": context_chunks})
+
+
+@router.post("/generate_stream")
+async def generate_stream(request: TextRequest):
+    """
+    Streams the answer as server-sent events: "message" events carry text
+    deltas as they arrive from GigaChat, a final "done" event closes the
+    stream. A cached answer is sent as a single delta.
+    """
+    context_chunks = await search(request)
+    ids = chunk_ids(context_chunks)
+    cached = await run_in_threadpool(answer_cache.get, request.text, ids)
+    prompt = build_prompt(context_chunks, request.text)
+
+    async def events():
+        if cached is not None:
+            yield sse_event({"delta": cached})
+            yield sse_event({}, event="done")
+            return
+
+        start = time.perf_counter()
+        deltas = []
+        try:
+            async for delta in llm_stream(prompt):
+                deltas.append(delta)
+                yield sse_event({"delta": delta})
+        except Exception as e:
+            logger.error(f"Streaming generation failed: {e}")
+            yield sse_event({"error": str(e)}, event="error")
+            return
+        await run_in_threadpool(
+            answer_cache.put,
+            request.text,
+            ids,
+            "".join(deltas),
+            time.perf_counter() - start,
         )
+        yield sse_event({}, event="done")
 
-    prompt = f"Контекст: \n{context}\n\n Запрос: {request.text}"
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    response = generate(prompt)
-    return JSONResponse(content={"message": response, "context": context_chunks})
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return JSONResponse(
+        content={
+            "retrieval": retrieval_cache.stats(),
+            "answer": answer_cache.stats(),
+            "duckling": duckling.stats(),
+            "embedding": query_embedder.stats(),
+            "lemmatizer": lemmatizer.stats(),
+        }
+    )
+
+
+@router.post("/cache/invalidate")
+async def invalidate_cache():
+    retrieval_cache.invalidate()
+    await run_in_threadpool(answer_cache.invalidate)
+    return JSONResponse(content={"status": "ok"})
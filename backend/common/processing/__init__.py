@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_warm = threading.Event()
+
+
+def warmup(keywords: bool = True):
+    """
+    Loads the stopwords, the morphological analyzer and, with keywords, the
+    YAKE extractors, which are otherwise loaded on first use. Services call
+    it in the background once they accept connections.
+    """
+    from processing.lemmatization import get_stopwords, lemmatizer
+
+    get_stopwords()
+    lemmatizer.morph
+    if keywords:
+        from processing.keywords import article_extractor, chunk_extractor
+
+        chunk_extractor()
+        article_extractor()
+    _warm.set()
+
+
+def is_warm() -> bool:
+    return _warm.is_set()
+
+
+def _log_warmup_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Warmup failed, the service stays not ready: {task.exception()}")
+
+
+def start_warmup(**kwargs) -> asyncio.Task:
+    """
+    Runs warmup in a thread from a running event loop. A failure is logged
+    as soon as it happens; the task can be awaited at shutdown.
+    """
+    task = asyncio.create_task(asyncio.to_thread(warmup, **kwargs))
+    task.add_done_callback(_log_warmup_failure)
+    return task
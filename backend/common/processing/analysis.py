@@ -0,0 +1,78 @@
+import re
+import string
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+from processing.lemmatization import get_stopwords, lemmatizer
+from razdel import sentenize
+
+WORD_RE = re.compile(r"\S+")
+# Parts of a word clean_text removes as a whole: links and the "[id|" part
+# of mentions.
+MARKUP_RE = re.compile(r"http\S+|\[[^]|]*\|")
+STRIP_TABLE = str.maketrans("", "", string.punctuation + string.digits + "«»—–…“”„")
+
+
+def clean_word(word: str) -> Optional[str]:
+    """
+    Word-level clean_text: lowercased, without links, digits and
+    punctuation. Returns None for words that clean_text would drop.
+    """
+    word = word.lower()
+    if "http" in word or "[" in word:
+        word = MARKUP_RE.sub("", word)
+    cleaned = word.translate(STRIP_TABLE)
+    if not cleaned or cleaned in get_stopwords():
+        return None
+    return cleaned
+
+
+class TextAnalysis:
+    """
+    Sentences and words of a document from a single pass over the text.
+
+    Words are split on whitespace, as in clean_text, and stored as parallel
+    lists: character offsets into the text, the cleaned form (None for
+    dropped words) and the lemma of every kept word. sentence_tokens[i] is
+    the index of the first word of sentence i, so a range of sentences maps
+    to a contiguous range of words.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sentences: List[Tuple[int, int]] = [
+            (sentence.start, sentence.stop) for sentence in sentenize(text)
+        ]
+        self.token_starts: List[int] = []
+        self.token_ends: List[int] = []
+        self.cleaned: List[Optional[str]] = []
+        self.lemmas: List[Optional[str]] = []
+
+        for match in WORD_RE.finditer(text):
+            cleaned = clean_word(match.group())
+            self.token_starts.append(match.start())
+            self.token_ends.append(match.end())
+            self.cleaned.append(cleaned)
+            self.lemmas.append(lemmatizer.lemmatize_token(cleaned) if cleaned else None)
+
+        self.sentence_tokens: List[int] = [
+            bisect_left(self.token_starts, start) for start, _ in self.sentences
+        ] + [len(self.token_starts)]
+        self.sentence_words: List[int] = [
+            end - start
+            for start, end in zip(self.sentence_tokens, self.sentence_tokens[1:])
+        ]
+
+    def sentence_text(self, first: int, last: int) -> str:
+        """Original text of sentences first..last - 1 joined by spaces."""
+        return " ".join(
+            self.text[start:end] for start, end in self.sentences[first:last]
+        )
+
+    def cleaned_text(self, first: int, last: int) -> str:
+        tokens = self.cleaned[self.sentence_tokens[first] : self.sentence_tokens[last]]
+        return " ".join(token for token in tokens if token)
+
+    def lemmatized_text(self, first: int, last: int) -> str:
+        lemmas = self.lemmas[self.sentence_tokens[first] : self.sentence_tokens[last]]
+        return " ".join(lemma for lemma in lemmas if lemma)
@@ -0,0 +1,177 @@
+import time
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from processing.analysis import TextAnalysis
+from processing.keywords import extract_article_keywords
+from processing.lemmatization import lemmatizer
+from processing.time import (
+    aparse_entities_with_duckling,
+    parse_entities_with_duckling,
+    split_entities,
+)
+
+MAX_WORDS_PER_CHUNK = 80
+CHUNK_SEPARATOR = "\n"
+
+
+def chunk_sentences(analysis: TextAnalysis) -> List[Tuple[int, int]]:
+    """
+    Groups sentences into chunks of at most MAX_WORDS_PER_CHUNK words and
+    returns the (first, last + 1) sentence range of each chunk.
+    """
+    ranges = []
+    first = 0
+    current_word_count = 0
+
+    for i, word_count in enumerate(analysis.sentence_words):
+        if current_word_count + word_count <= MAX_WORDS_PER_CHUNK:
+            current_word_count += word_count
+        else:
+            if i > first:
+                ranges.append((first, i))
+            first = i
+            current_word_count = word_count
+
+    if len(analysis.sentences) > first:
+        ranges.append((first, len(analysis.sentences)))
+
+    return ranges
+
+
+def analyze_text(
+    text: str,
+    timings: Optional[Dict[str, float]] = None,
+    clean_content: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    CPU-bound part of article processing: chunks, lemmas and keywords, no
+    network calls. The text is sentenized, tokenized, cleaned and
+    lemmatized once, and every chunk is built from that analysis. Chunk
+    content is the original text, or the cleaned text with clean_content.
+    When a timings dict is given, the seconds spent in the analyze, chunk
+    and keywords steps are added to it.
+    """
+    timings = {} if timings is None else timings
+
+    start = time.perf_counter()
+    analysis = TextAnalysis(text)
+    analyzed = time.perf_counter()
+    ranges = chunk_sentences(analysis)
+    cleaned_chunks = [analysis.cleaned_text(first, last) for first, last in ranges]
+    chunks = (
+        cleaned_chunks
+        if clean_content
+        else [analysis.sentence_text(first, last) for first, last in ranges]
+    )
+    lemmatized_contents = [
+        analysis.lemmatized_text(first, last) for first, last in ranges
+    ]
+    chunked = time.perf_counter()
+    lemmatized_keywords = [
+        [
+            " ".join(lemmatizer.lemmatize_token(word) for word in keyword.split())
+            for keyword in keywords
+        ]
+        for keywords in extract_article_keywords(cleaned_chunks)
+    ]
+    finished = time.perf_counter()
+
+    for step, seconds in (
+        ("analyze", analyzed - start),
+        ("chunk", chunked - analyzed),
+        ("keywords", finished - chunked),
+    ):
+        timings[step] = timings.get(step, 0.0) + seconds
+
+    return [
+        {
+            "content": chunk,
+            "lemmatized_content": lemmatized_content,
+            "lemmatized_keywords": keywords,
+        }
+        for chunk, lemmatized_content, keywords in zip(
+            chunks, lemmatized_contents, lemmatized_keywords
+        )
+    ]
+
+
+def join_chunks(chunks: List[str]) -> Tuple[str, List[int]]:
+    """
+    Joins chunks into one text for a single Duckling call and returns the
+    offset at which each chunk starts in it.
+    """
+    starts = []
+    offset = 0
+    for chunk in chunks:
+        starts.append(offset)
+        offset += len(chunk) + len(CHUNK_SEPARATOR)
+    return CHUNK_SEPARATOR.join(chunks), starts
+
+
+def assign_entities(entities: List[dict], starts: List[int]) -> List[Tuple]:
+    """
+    Assigns Duckling entities of the joined text to the chunks they start in
+    and returns (points, intervals) for every chunk.
+    """
+    chunk_entities = [[] for _ in starts]
+    for entity in entities:
+        chunk_entities[bisect_right(starts, entity["start"]) - 1].append(entity)
+    return [split_entities(entities) for entities in chunk_entities]
+
+
+def _add_metadata(
+    chunk_objects: List[Dict[str, Any]],
+    entities: List[dict],
+    starts: List[int],
+    source_id: Optional[str],
+    date: Optional[str],
+) -> List[Dict[str, Any]]:
+    for chunk_object, (points, intervals) in zip(
+        chunk_objects, assign_entities(entities, starts)
+    ):
+        chunk_object.update(
+            {
+                "source_id": source_id,
+                "date": date,
+                "points": points,
+                "intervals": intervals,
+            }
+        )
+    return chunk_objects
+
+
+def process_text(
+    text: str,
+    source_id: Optional[str],
+    date: Optional[str],
+    clean_content: bool = False,
+):
+    """
+    Chunks and processes one article. Temporal expressions are parsed with
+    one Duckling call for the whole article, relative to its publication
+    date.
+    """
+    chunk_objects = analyze_text(text, clean_content=clean_content)
+    joined, starts = join_chunks([chunk["content"] for chunk in chunk_objects])
+    reftime = datetime.fromisoformat(date) if date else None
+    entities = parse_entities_with_duckling(joined, reftime) if chunk_objects else []
+
+    return _add_metadata(chunk_objects, entities, starts, source_id, date)
+
+
+async def aprocess_analyzed_chunks(
+    chunk_objects: List[Dict[str, Any]], source_id: Optional[str], date: Optional[str]
+) -> List[Dict[str, Any]]:
+    """
+    Async second half of process_text for chunks that already went
+    through analyze_text, e.g. in a worker process.
+    """
+    text, starts = join_chunks([chunk["content"] for chunk in chunk_objects])
+    reftime = datetime.fromisoformat(date) if date else None
+    entities = (
+        await aparse_entities_with_duckling(text, reftime) if chunk_objects else []
+    )
+
+    return _add_metadata(chunk_objects, entities, starts, source_id, date)
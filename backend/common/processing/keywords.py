@@ -0,0 +1,126 @@
+import os
+from difflib import SequenceMatcher
+from functools import cache
+from typing import Any, Dict, List, Set
+
+from processing.lemmatization import get_stopwords
+
+KEYWORDS_PER_CHUNK = 15
+# Candidates kept from a whole article before they are assigned to chunks.
+ARTICLE_KEYWORDS_TOP = int(os.getenv("ARTICLE_KEYWORDS_TOP", 500))
+KEYWORD_MIN_SCORE = 0.5
+# YAKE scores of a keyword computed over a whole article of n chunks are
+# about n ** -ARTICLE_SCORE_EXPONENT times its score within its chunk; the
+# exponent is fitted by test/bench_keywords.py.
+ARTICLE_SCORE_EXPONENT = float(os.getenv("ARTICLE_SCORE_EXPONENT", 1.28))
+# Same similarity limit as YAKE's own deduplication.
+KEYWORD_DEDUP_LIMIT = 0.9
+MAX_KEYWORD_WORDS = 2
+
+
+@cache
+def _extractor(top: int, dedup_lim: float = KEYWORD_DEDUP_LIMIT):
+    """YAKE extractors are imported and built on first use."""
+    from yake import KeywordExtractor
+
+    return KeywordExtractor(
+        lan="ru",
+        n=MAX_KEYWORD_WORDS,
+        top=top,
+        dedup_lim=dedup_lim,
+        stopwords=get_stopwords(),
+    )
+
+
+def chunk_extractor():
+    return _extractor(KEYWORDS_PER_CHUNK)
+
+
+def article_extractor():
+    # YAKE deduplicates candidates pairwise, which is quadratic in top;
+    # article candidates are deduplicated per chunk instead, as
+    # extract_keywords does.
+    return _extractor(ARTICLE_KEYWORDS_TOP, dedup_lim=1.0)
+
+
+def extract_keywords(text: str) -> List[str]:
+    """
+    Extracts keywords from the text using YAKE.
+    """
+    keywords = chunk_extractor().extract_keywords(text)
+    return [keyword[0] for keyword in keywords if keyword[1] > KEYWORD_MIN_SCORE]
+
+
+def _ngrams(text: str) -> Set[str]:
+    words = text.lower().split()
+    return {
+        " ".join(words[i : i + n])
+        for n in range(1, MAX_KEYWORD_WORDS + 1)
+        for i in range(len(words) - n + 1)
+    }
+
+
+def _is_similar(a: str, b: str) -> bool:
+    # The quick ratios are upper bounds of ratio() and rule out most pairs.
+    matcher = SequenceMatcher(None, a, b)
+    return (
+        matcher.real_quick_ratio() > KEYWORD_DEDUP_LIMIT
+        and matcher.quick_ratio() > KEYWORD_DEDUP_LIMIT
+        and matcher.ratio() > KEYWORD_DEDUP_LIMIT
+    )
+
+
+def _is_duplicate(keyword: str, selected: List[str]) -> bool:
+    return any(_is_similar(keyword, other) for other in selected)
+
+
+def assign_keywords(keywords: List[str], chunks: List[str]) -> List[List[str]]:
+    """
+    Gives every chunk the keywords that occur in it as whole words, best
+    first and without near-duplicates, at most KEYWORDS_PER_CHUNK of them.
+    """
+    assigned = []
+    for chunk in chunks:
+        ngrams = _ngrams(chunk)
+        found = []
+        for keyword in keywords:
+            if keyword.lower() in ngrams and not _is_duplicate(keyword, found):
+                found.append(keyword)
+                if len(found) == KEYWORDS_PER_CHUNK:
+                    break
+        assigned.append(found)
+    return assigned
+
+
+def article_min_score(n_chunks: int) -> float:
+    """KEYWORD_MIN_SCORE rescaled to scores computed over n_chunks chunks."""
+    return KEYWORD_MIN_SCORE * n_chunks**-ARTICLE_SCORE_EXPONENT
+
+
+def extract_article_keywords(chunks: List[str]) -> List[List[str]]:
+    """
+    Extracts keywords of all chunks of an article with one YAKE call on the
+    whole article instead of one call per chunk.
+    """
+    if not chunks:
+        return []
+    keywords = article_extractor().extract_keywords(" ".join(chunks))
+    scores = dict(keywords)
+    min_score = article_min_score(len(chunks))
+    if not any(score > min_score for score in scores.values()):
+        # Nothing would pass the filter, so there is nothing to assign.
+        return [[] for _ in chunks]
+    # Filtered after the assignment, like extract_keywords filters the top
+    # keywords of its chunk.
+    return [
+        [keyword for keyword in found if scores[keyword] > min_score]
+        for found in assign_keywords([keyword for keyword, _ in keywords], chunks)
+    ]
+
+
+def extract_keywords_many(articles: List[List[str]]) -> List[List[List[str]]]:
+    """
+    Batch version of extract_article_keywords. The extractor and its
+    stopword set are built once and shared by all articles.
+    """
+    return [extract_article_keywords(chunks) for chunks in articles]
@@ -0,0 +1,107 @@
+import os
+import re
+import string
+import threading
+from functools import cache, lru_cache
+from itertools import chain
+from typing import Dict, FrozenSet, List
+
+from razdel import tokenize
+
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", 100_000))
+
+
+@cache
+def get_stopwords() -> FrozenSet[str]:
+    """
+    Russian NLTK stopwords, loaded on first use and downloaded if the
+    corpus is missing.
+    """
+    import nltk
+
+    try:
+        words = nltk.corpus.stopwords.words("russian")
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+        words = nltk.corpus.stopwords.words("russian")
+    return frozenset(words)
+
+
+def clean_text(text: str) -> str:
+    text = text.lower()
+
+    text = re.sub(r"\[.*?\|([^]]+)\]", r"\1", text)
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"\d+", "", text)
+    text = re.sub(f"[{string.punctuation}]", "", text)
+    stopwords = get_stopwords()
+    text = " ".join([word for word in text.split() if word not in stopwords])
+    return text
+
+
+class Lemmatizer:
+    """
+    pymorphy3 lemmatizer with a bounded per-token cache.
+
+    Token frequencies are very skewed, so most tokens of a new text have
+    already been parsed; lemmatize_many also parses each distinct token of
+    a batch only once. The MorphAnalyzer and its dictionaries are loaded on
+    the first parse unless one is passed in.
+    """
+
+    def __init__(self, morph=None, cache_size: int = LEMMA_CACHE_SIZE):
+        self._morph = morph
+        self._lock = threading.Lock()
+        self.lemmatize_token = lru_cache(maxsize=cache_size)(self._normal_form)
+
+    @property
+    def morph(self):
+        if self._morph is None:
+            with self._lock:
+                if self._morph is None:
+                    from pymorphy3 import MorphAnalyzer
+
+                    self._morph = MorphAnalyzer()
+        return self._morph
+
+    def _normal_form(self, token: str) -> str:
+        return self.morph.parse(token)[0].normal_form
+
+    def lemmatize(self, text: str) -> str:
+        return " ".join([self.lemmatize_token(token.text) for token in tokenize(text)])
+
+    def lemmatize_many(self, texts: List[str]) -> List[str]:
+        tokenized = [[token.text for token in tokenize(text)] for text in texts]
+        lemmas = {
+            token: self.lemmatize_token(token)
+            for token in set(chain.from_iterable(tokenized))
+        }
+        return [" ".join([lemmas[token] for token in tokens]) for tokens in tokenized]
+
+    def stats(self) -> Dict[str, float]:
+        info = self.lemmatize_token.cache_info()
+        requests = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / requests if requests else 0.0,
+        }
+
+
+lemmatizer = Lemmatizer()
+
+
+def lemmatize_text(text: str) -> str:
+    """
+    Lemmatizes the text using pymorphy3.
+    """
+    return lemmatizer.lemmatize(text)
+
+
+def lemmatize_many(texts: List[str]) -> List[str]:
+    """
+    Lemmatizes a batch of texts, parsing each distinct token once.
+    """
+    return lemmatizer.lemmatize_many(texts)
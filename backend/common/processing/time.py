@@ -0,0 +1,232 @@
+import asyncio
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DUCKLING_URL = os.getenv("DUCKLING_URL", "http://localhost:8002")
+DUCKLING_TIMEOUT = float(os.getenv("DUCKLING_TIMEOUT", 5))
+DUCKLING_POOL_SIZE = int(os.getenv("DUCKLING_POOL_SIZE", 16))
+DUCKLING_CACHE_SIZE = int(os.getenv("DUCKLING_CACHE_SIZE", 4096))
+DUCKLING_TIMEZONE = ZoneInfo("Europe/Moscow")
+# Queries without a reference time are resolved against the current time
+# rounded down to this many seconds, so that they can share cache entries.
+DUCKLING_REFTIME_BUCKET = int(os.getenv("DUCKLING_REFTIME_BUCKET", 60))
+
+
+def _parse_entities(response):
+    entities = []
+
+    for entity in response:
+        if entity["dim"] == "time":
+            value = entity["value"]
+            grain = value.get("grain")
+            span = {"start": entity["start"], "end": entity["end"]}
+            if value["type"] == "value":
+                entities.append(
+                    {**span, "point": {"point": value["value"], "grain": grain}}
+                )
+            elif value["type"] == "interval":
+                start, end = value.get("from"), value.get("to")
+                if start and end:
+                    entities.append(
+                        {
+                            **span,
+                            "interval": {
+                                "start": start["value"],
+                                "end": end["value"],
+                                "grain": grain,
+                            },
+                        }
+                    )
+                elif start or end:
+                    # Open-ended intervals ("с 1 сентября") keep their only
+                    # bound as a point.
+                    bound = start or end
+                    entities.append(
+                        {**span, "point": {"point": bound["value"], "grain": grain}}
+                    )
+
+    return entities
+
+
+def split_entities(entities):
+    """Drops character spans and splits entities into points and intervals."""
+    temporal_points = [entity["point"] for entity in entities if "point" in entity]
+    temporal_intervals = [
+        entity["interval"] for entity in entities if "interval" in entity
+    ]
+    return temporal_points, temporal_intervals
+
+
+class DucklingClient:
+    """
+    Duckling client with pooled keep-alive connections and an LRU cache.
+
+    Entities keep their character spans, so a long text can be parsed once
+    and its entities assigned to parts of it. Results are cached by text and
+    reference time, which is always sent to Duckling together with the
+    Moscow timezone; when reftime is not given the current time rounded down
+    to DUCKLING_REFTIME_BUCKET seconds is used. Failed calls are logged and return no temporal
+    entities, or raise when strict is set.
+    """
+
+    def __init__(
+        self,
+        url: str = DUCKLING_URL,
+        timeout: float = DUCKLING_TIMEOUT,
+        pool_size: int = DUCKLING_POOL_SIZE,
+        cache_size: int = DUCKLING_CACHE_SIZE,
+    ):
+        self.url = f"{url}/parse"
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        self._async_session: Optional[aiohttp.ClientSession] = None
+
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _request(self, text: str, reftime: Optional[datetime]):
+        if reftime is None:
+            now = int(time.time())
+            reftime_ms = (now - now % DUCKLING_REFTIME_BUCKET) * 1000
+        else:
+            reftime_ms = int(reftime.timestamp() * 1000)
+        data = {
+            "locale": "ru_RU",
+            "text": text,
+            "reftime": reftime_ms,
+            "tz": str(DUCKLING_TIMEZONE),
+        }
+        return (text, reftime_ms), data
+
+    def _get_cached(self, key):
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(result)
+
+    def _put_cached(self, key, result):
+        with self._lock:
+            self._cache[key] = copy.deepcopy(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def parse_entities(
+        self, text: str, reftime: Optional[datetime] = None, strict: bool = False
+    ):
+        key, data = self._request(text, reftime)
+        result = self._get_cached(key)
+        if result is not None:
+            return result
+
+        try:
+            response = self.session.post(self.url, data=data, timeout=self.timeout)
+            response.raise_for_status()
+            result = _parse_entities(response.json())
+        except requests.RequestException as e:
+            if strict:
+                raise
+            logger.warning(f"Duckling request failed: {e}")
+            return []
+
+        self._put_cached(key, result)
+        return result
+
+    async def aparse_entities(
+        self, text: str, reftime: Optional[datetime] = None, strict: bool = False
+    ):
+        key, data = self._request(text, reftime)
+        result = self._get_cached(key)
+        if result is not None:
+            return result
+
+        if self._async_session is None or self._async_session.closed:
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+        try:
+            async with self._async_session.post(self.url, data=data) as response:
+                response.raise_for_status()
+                result = _parse_entities(await response.json(content_type=None))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if strict:
+                raise
+            logger.warning(f"Duckling request failed: {e}")
+            return []
+
+        self._put_cached(key, result)
+        return result
+
+    def parse(self, text: str, reftime: Optional[datetime] = None):
+        return split_entities(self.parse_entities(text, reftime))
+
+    async def aparse(self, text: str, reftime: Optional[datetime] = None):
+        return split_entities(await self.aparse_entities(text, reftime))
+
+    async def aclose(self):
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests_count = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests_count if requests_count else 0.0,
+            }
+
+
+duckling = DucklingClient()
+
+
+def parse_with_duckling(text, reftime: Optional[datetime] = None):
+    return duckling.parse(text, reftime)
+
+
+async def aparse_with_duckling(text, reftime: Optional[datetime] = None):
+    return await duckling.aparse(text, reftime)
+
+
+def parse_entities_with_duckling(
+    text, reftime: Optional[datetime] = None, strict: bool = False
+):
+    return duckling.parse_entities(text, reftime, strict)
+
+
+async def aparse_entities_with_duckling(
+    text, reftime: Optional[datetime] = None, strict: bool = False
+):
+    return await duckling.aparse_entities(text, reftime, strict)
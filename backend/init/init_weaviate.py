@@ -39,6 +39,58 @@ def initialize_weaviate():
         raise
 
 
+# News fields copied onto every chunk, so retrieval can filter and build
+# results without resolving the "news" cross-reference.
+CHUNK_NEWS_PROPERTIES = [
+    wvc.config.Property(
+        name="date",
+        data_type=wvc.config.DataType.DATE,
+        description="Date of the parent news article",
+        index_range_filters=True,
+    ),
+    wvc.config.Property(
+        name="url",
+        data_type=wvc.config.DataType.TEXT,
+        description="URL of the parent news article",
+        skip_vectorization=True,
+        index_searchable=False,
+        tokenization=wvc.config.Tokenization.FIELD,
+    ),
+    wvc.config.Property(
+        name="source_id",
+        data_type=wvc.config.DataType.TEXT,
+        description="Identifier of the parent news source",
+        skip_vectorization=True,
+        index_searchable=False,
+        tokenization=wvc.config.Tokenization.FIELD,
+    ),
+]
+
+# Hash of the ingested article fields, used by the parser to skip articles
+# that have not changed since the last run.
+NEWS_INGEST_PROPERTIES = [
+    wvc.config.Property(
+        name="content_hash",
+        data_type=wvc.config.DataType.TEXT,
+        description="Hash of the ingested article content",
+        skip_vectorization=True,
+        index_filterable=False,
+        index_searchable=False,
+    ),
+]
+
+
+def add_missing_properties(
+    collection: weaviate.collections.Collection,
+    properties: list[wvc.config.Property],
+):
+    existing_properties = {prop.name for prop in collection.config.get().properties}
+    for prop in properties:
+        if prop.name not in existing_properties:
+            collection.config.add_property(prop)
+            logger.info(f"Added property '{prop.name}' to '{collection.name}' class")
+
+
 def create_schema(client: weaviate.WeaviateClient):
     try:
         existing_collections = [coll for coll in client.collections.list_all()]
@@ -63,6 +115,7 @@ def create_schema(client: weaviate.WeaviateClient):
                         data_type=wvc.config.DataType.TEXT,
                         description="Identifier of the news source",
                     ),
+                    *NEWS_INGEST_PROPERTIES,
                 ],
                 vector_index_config=wvc.config.Configure.VectorIndex.hnsw(
                     distance_metric=wvc.config.VectorDistances.COSINE
@@ -72,6 +125,9 @@ def create_schema(client: weaviate.WeaviateClient):
             logger.info("Schema for 'News' class created successfully")
         else:
             logger.info("'News' class already exists")
+            add_missing_properties(
+                client.collections.get("News"), NEWS_INGEST_PROPERTIES
+            )
 
         if "Chunk" not in existing_collections:
             chunk_class = client.collections.create(
@@ -93,6 +149,7 @@ def create_schema(client: weaviate.WeaviateClient):
                         data_type=wvc.config.DataType.TEXT_ARRAY,
                         description="Lemmatized keywords",
                     ),
+                    *CHUNK_NEWS_PROPERTIES,
                     wvc.config.Property(
                         name="temporal_points",
                         data_type=wvc.config.DataType.OBJECT_ARRAY,
@@ -146,6 +203,9 @@ def create_schema(client: weaviate.WeaviateClient):
             logger.info("Schema for 'Chunk' class created successfully")
         else:
             logger.info("'Chunk' class already exists")
+            add_missing_properties(
+                client.collections.get("Chunk"), CHUNK_NEWS_PROPERTIES
+            )
     except Exception as e:
         logger.error(f"Error creating schema: {e}")
         raise
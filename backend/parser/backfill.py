@@ -0,0 +1,68 @@
+import logging
+
+import weaviate
+from database.connection import initialize_weaviate
+from weaviate.classes.query import QueryReference
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NEWS_PROPERTIES = ["date", "url", "source_id"]
+
+
+def backfill_chunk_news_properties(client: weaviate.WeaviateClient):
+    """Copy date, url and source_id from the referenced News onto each Chunk."""
+    chunk_collection = client.collections.get("Chunk")
+
+    updated = 0
+    skipped = 0
+    for chunk in chunk_collection.iterator(
+        return_properties=NEWS_PROPERTIES,
+        return_references=QueryReference(
+            link_on="news", return_properties=NEWS_PROPERTIES
+        ),
+    ):
+        if all(chunk.properties.get(name) for name in NEWS_PROPERTIES):
+            skipped += 1
+            continue
+
+        news = chunk.references.get("news") if chunk.references else None
+        if not news or not news.objects:
+            logger.warning(f"Chunk {chunk.uuid} has no News reference, skipping")
+            skipped += 1
+            continue
+
+        news_properties = news.objects[0].properties
+        try:
+            chunk_collection.data.update(
+                uuid=chunk.uuid,
+                properties={
+                    name: news_properties.get(name) for name in NEWS_PROPERTIES
+                },
+            )
+            updated += 1
+        except Exception as e:
+            logger.error(f"Error updating Chunk {chunk.uuid}: {e}")
+            continue
+
+        if updated % 1000 == 0:
+            logger.info(f"Backfilled {updated} chunks")
+
+    logger.info(f"Backfill completed: {updated} chunks updated, {skipped} skipped")
+
+
+def main():
+    client = initialize_weaviate()
+
+    try:
+        backfill_chunk_news_properties(client)
+    except Exception as e:
+        logger.error(f"Backfill failed: {e}")
+        raise
+    finally:
+        client.close()
+        logger.info("Weaviate connection closed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class IngestCheckpoint:
+    """
+    Tracks how far into a JSONL file ingestion has been committed.
+
+    Lines are processed out of order by the pipeline, so the committed
+    position is the start of the oldest line that is still in flight, or the
+    end of the last line read when nothing is. Offsets are counted in the
+    decompressed stream. The position is saved to a JSON file together with
+    the size and modification time of the input, and used to resume after a
+    crash only if the input has not changed since.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = source
+        self._pending: OrderedDict = OrderedDict()
+        self._read = (0, 0)
+        self._lock = threading.Lock()
+
+    def load(self) -> tuple:
+        """Returns the (byte offset, line number) to resume from."""
+        if not os.path.exists(self.path):
+            return 0, 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return 0, 0
+
+        if state.get("source") != self.source or state.get("stat") != self._stat():
+            logger.warning(f"Checkpoint {self.path} does not match {self.source}")
+            return 0, 0
+
+        self._read = (state["offset"], state["line"])
+        return self._read
+
+    def _stat(self) -> list:
+        stat = os.stat(self.source)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def read(self, line_number: int, start: int, end: int, pending: bool):
+        """Registers a line that was read; pending lines wait for done()."""
+        with self._lock:
+            if pending:
+                self._pending[line_number] = start
+            self._read = (end, line_number)
+
+    def done(self, line_number: int):
+        with self._lock:
+            self._pending.pop(line_number, None)
+
+    def committed(self) -> tuple:
+        with self._lock:
+            if not self._pending:
+                return self._read
+            line_number, start = next(iter(self._pending.items()))
+            return start, line_number - 1
+
+    def save(self):
+        """Saves the committed position; call only after the batch is flushed."""
+        offset, line_number = self.committed()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "source": self.source,
+                    "stat": self._stat(),
+                    "offset": offset,
+                    "line": line_number,
+                },
+                file,
+            )
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,134 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the timing histogram buckets, in milliseconds.
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class StageTimer:
+    """Count, total, max and a fixed-bucket histogram of one stage's timings."""
+
+    def __init__(self):
+        self.count = 0
+        self.items = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def observe(self, seconds: float, items: int = 1):
+        self.count += 1
+        self.items += items
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+
+    def summary(self) -> dict:
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [
+            f">{HISTOGRAM_BOUNDS_MS[-1]}ms"
+        ]
+        return {
+            "count": self.count,
+            "items": self.items,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class IngestMetrics:
+    """
+    Thread-safe counters and per-stage timings of an ingestion run.
+
+    Timings measured in the worker processes are sent back with the article
+    and merged with observe_many. A background reporter logs throughput at a
+    fixed interval.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reporter: Optional[threading.Thread] = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters: Counter = Counter()
+            self.stages: Dict[str, StageTimer] = {}
+            self.started = time.monotonic()
+
+    def observe(self, stage: str, seconds: float, items: int = 1):
+        with self._lock:
+            self.stages.setdefault(stage, StageTimer()).observe(seconds, items)
+
+    def observe_many(self, timings: Dict[str, float]):
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    @contextmanager
+    def timed(self, stage: str, items: int = 1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, items)
+
+    def incr(self, counter: str, n: int = 1):
+        with self._lock:
+            self.counters[counter] += n
+
+    def objects_written(self) -> int:
+        with self._lock:
+            return self.counters["news_written"] + self.counters["chunks_written"]
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        with self._lock:
+            written = self.counters["news_written"] + self.counters["chunks_written"]
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "objects_per_s": round(written / elapsed, 3) if elapsed else 0.0,
+                "counters": dict(self.counters),
+                "stages": {
+                    stage: timer.summary() for stage, timer in self.stages.items()
+                },
+            }
+
+    def _report(self, interval: float, gauges: Callable[[], dict]):
+        last_written, last_time = 0, time.monotonic()
+        while not self._stop.wait(interval):
+            written, now = self.objects_written(), time.monotonic()
+            logger.info(
+                f"Ingest progress: {written} objects, "
+                f"{(written - last_written) / (now - last_time):.1f} objects/s "
+                f"(overall {written / (now - self.started):.1f}), "
+                f"queues {gauges()}"
+            )
+            last_written, last_time = written, now
+
+    def start_reporter(self, interval: float, gauges: Callable[[], dict] = dict):
+        self._stop.clear()
+        self._reporter = threading.Thread(
+            target=self._report, args=(interval, gauges), daemon=True
+        )
+        self._reporter.start()
+
+    def stop_reporter(self):
+        self._stop.set()
+        if self._reporter is not None:
+            self._reporter.join()
+
+    def write_summary(self, path: Optional[str] = None):
+        summary = json.dumps(self.summary(), ensure_ascii=False)
+        logger.info(f"Ingest summary: {summary}")
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(summary)
@@ -1,130 +1,646 @@
+import asyncio
+import hashlib
+import itertools
 import json
 import logging
+import multiprocessing as mp
 import os
-import uuid
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
+import aiohttp
+import orjson
+import requests
 import weaviate
+from checkpoint import IngestCheckpoint
 from database.connection import initialize_weaviate
-from processing.chunking import chunk_text, process_chunks
+from metrics import IngestMetrics
+from processing import warmup
+from processing.chunking import analyze_text, assign_entities, join_chunks
+from processing.time import (
+    DUCKLING_POOL_SIZE,
+    aparse_entities_with_duckling,
+    duckling,
+)
+from shards import SHARD_READ_ERRORS, find_shards, is_compressed, open_shard
+from weaviate.classes.query import Filter
+from weaviate.collections.classes.batch import ErrorObject
+from weaviate.util import generate_uuid5
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+APP_URL = os.getenv("APP_URL", "http://localhost:8002")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 256))
+INGEST_DUCKLING_CONCURRENCY = int(
+    os.getenv("INGEST_DUCKLING_CONCURRENCY", DUCKLING_POOL_SIZE)
+)
+INGEST_CHECKPOINT_INTERVAL = int(os.getenv("INGEST_CHECKPOINT_INTERVAL", 1000))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", 3))
+INGEST_INPUT = os.getenv("INGEST_INPUT", "/data/news.jsonl")
+INGEST_READERS = int(os.getenv("INGEST_READERS", 4))
+INGEST_PROGRESS_INTERVAL = int(os.getenv("INGEST_PROGRESS_INTERVAL", 10000))
+INGEST_CHECKPOINT_DIR = os.getenv("INGEST_CHECKPOINT_DIR")
+INGEST_REPORT_INTERVAL = float(os.getenv("INGEST_REPORT_INTERVAL", 10))
+INGEST_METRICS_PATH = os.getenv("INGEST_METRICS_PATH")
+# Per-article debug logs are written for one line in INGEST_LOG_SAMPLE_EVERY.
+INGEST_LOG_SAMPLE_EVERY = int(os.getenv("INGEST_LOG_SAMPLE_EVERY", 1000))
+# How often a full write queue is checked for a writer that has stopped.
+WRITE_QUEUE_TIMEOUT = 1.0
 
-def populate_weaviate(client: weaviate.WeaviateClient, jsonl_file: str):
-    """Read JSONL file and populate News and Chunk collections."""
-    if not os.path.exists(jsonl_file):
-        logger.info(f"File {jsonl_file} does not exist. Skipping population.")
+_DONE = None
+
+metrics = IngestMetrics()
+
+
+def sampled(line_number: int) -> bool:
+    return line_number % INGEST_LOG_SAMPLE_EVERY == 0
+
+
+def news_object_uuid(news_url: str) -> str:
+    return generate_uuid5(news_url, "News")
+
+
+def chunk_object_uuid(news_url: str, index: int) -> str:
+    return generate_uuid5(f"{news_url}#{index}", "Chunk")
+
+
+def content_hash(date: str, source_id: str, news_url: str, text: Optional[str]) -> str:
+    payload = json.dumps([date, source_id, news_url, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_known_news(client: weaviate.WeaviateClient) -> Dict[str, Dict[str, Any]]:
+    """
+    News already in Weaviate, by URL: the content hash of the object with the
+    deterministic UUID, and the UUIDs of older objects for the same URL that
+    were written with random UUIDs and have to be replaced.
+    """
+    news_collection = client.collections.get("News")
+    known_news = {}
+    for news in news_collection.iterator(return_properties=["url", "content_hash"]):
+        url = news.properties.get("url")
+        stored = known_news.setdefault(url, {"content_hash": None, "stale": []})
+        if str(news.uuid) == news_object_uuid(url):
+            stored["content_hash"] = news.properties.get("content_hash")
+        else:
+            stored["stale"].append(str(news.uuid))
+    return known_news
+
+
+def invalidate_app_cache():
+    """Drop cached retrieval results in the app after new data is indexed."""
+    try:
+        requests.post(f"{APP_URL}/api/cache/invalidate", timeout=5).raise_for_status()
+        logger.info("App retrieval cache invalidated")
+    except requests.RequestException as e:
+        logger.warning(f"Failed to invalidate app retrieval cache: {e}")
+
+
+def parse_line(line: bytes, line_number: int) -> Optional[Dict[str, Any]]:
+    data = orjson.loads(line)
+
+    date = data.get("date") / 1000
+    date = (
+        datetime.fromtimestamp(date, tz=ZoneInfo("Europe/Moscow")).isoformat()
+        if date
+        else None
+    )
+    if sampled(line_number):
+        logger.debug(f"Parsed date: {date} (line {line_number})")
+    source_id = data.get("source_id")
+    news_url = data.get("news_url")
+
+    if not all([date, source_id, news_url]):
+        logger.warning(
+            f"Skipping line {line_number}: Missing required fields (date, source_id, news_url)"
+        )
+        return None
+
+    text = data.get("text")
+    return {
+        "line_number": line_number,
+        "uuid": news_object_uuid(news_url),
+        "content_hash": content_hash(date, source_id, news_url, text),
+        "date": date,
+        "source_id": source_id,
+        "news_url": news_url,
+        "text": text,
+    }
+
+
+def analyze_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Chunk, lemmatize and extract keywords; runs in the process pool. Stage
+    timings are returned with the article.
+    """
+    timings = {}
+    article["chunks"] = (
+        analyze_text(article["text"], timings) if article["text"] else []
+    )
+    article["timings"] = timings
+    return article
+
+
+def read_shard(
+    path: str,
+    checkpoint: IngestCheckpoint,
+    known_news: Dict[str, Dict[str, Any]],
+    put: Callable[[Dict[str, Any]], None],
+    stop: threading.Event,
+) -> bool:
+    """
+    Reads the articles of one shard from its checkpointed position and skips
+    the ones whose content hash matches the stored one. Runs in a reader
+    thread until the shard ends or stop is set; returns whether the whole
+    shard was read.
+    """
+    offset, line_number = checkpoint.load()
+    if offset:
+        logger.info(f"Resuming {path} from line {line_number + 1}")
+    counts = Counter()
+
+    try:
+        with open_shard(path) as file:
+            if is_compressed(path):
+                for _ in itertools.islice(file, line_number):
+                    pass
+            else:
+                file.seek(offset)
+
+            for line_number, line in enumerate(file, line_number + 1):
+                if stop.is_set():
+                    logger.warning(f"Stopped reading {path} at line {line_number}")
+                    return False
+                start, offset = offset, offset + len(line)
+                try:
+                    with metrics.timed("parse"):
+                        article = parse_line(line, line_number)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Invalid JSON at {path}:{line_number}: {e}")
+                    article = None
+                except Exception as e:
+                    logger.error(f"Error processing {path}:{line_number}: {e}")
+                    article = None
+
+                stored = known_news.get(article["news_url"]) if article else None
+                if article is None:
+                    status = "invalid"
+                elif (
+                    stored is not None
+                    and not stored["stale"]
+                    and stored["content_hash"] == article["content_hash"]
+                ):
+                    if sampled(line_number):
+                        logger.debug(f"Skipping unchanged {path}:{line_number}")
+                    status = "unchanged"
+                    article = None
+                else:
+                    status = "queued"
+                counts[status] += 1
+                metrics.incr(f"articles_{status}")
+
+                metrics.incr("lines_read")
+                checkpoint.read(line_number, start, offset, pending=article is not None)
+                if article is not None:
+                    article["shard"] = path
+                    article["changed"] = stored is not None
+                    article["stale_uuids"] = stored["stale"] if stored else []
+                    put(article)
+
+                if line_number % INGEST_PROGRESS_INTERVAL == 0:
+                    logger.info(f"{path}: {line_number} lines read, {dict(counts)}")
+    except SHARD_READ_ERRORS as e:
+        # Truncated or corrupt compressed input fails at the same line on
+        # every run; the other shards go on.
+        logger.error(f"Could not read {path} after line {line_number}: {e}")
+        metrics.incr("shards_failed")
+        return False
+
+    logger.info(f"Finished reading {path}: {line_number} lines, {dict(counts)}")
+    return True
+
+
+async def read_articles(
+    shards: List[str],
+    articles: asyncio.Queue,
+    consumers: int,
+    known_news: Dict[str, Dict[str, Any]],
+    checkpoints: Dict[str, IngestCheckpoint],
+    stop: threading.Event,
+) -> List[str]:
+    """
+    Reads up to INGEST_READERS shards at a time, each in its own thread;
+    returns the shards that could not be read to the end.
+    """
+    loop = asyncio.get_running_loop()
+
+    def put(article: Dict[str, Any]):
+        asyncio.run_coroutine_threadsafe(articles.put(article), loop).result()
+
+    with ThreadPoolExecutor(max_workers=INGEST_READERS) as readers:
+        finished = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    readers, read_shard, path, checkpoints[path], known_news, put, stop
+                )
+                for path in shards
+            )
+        )
+
+    for _ in range(consumers):
+        await articles.put(_DONE)
+    return [path for path, ok in zip(shards, finished) if not ok]
+
+
+async def analyze_articles(
+    articles: asyncio.Queue,
+    analyzed: asyncio.Queue,
+    pool: ProcessPoolExecutor,
+    checkpoints: Dict[str, IngestCheckpoint],
+):
+    loop = asyncio.get_running_loop()
+    while (article := await articles.get()) is not _DONE:
+        try:
+            article = await loop.run_in_executor(pool, analyze_article, article)
+        except Exception as e:
+            logger.error(
+                f"Error processing {article['shard']}:{article['line_number']}: {e}"
+            )
+            checkpoints[article["shard"]].done(article["line_number"])
+            metrics.incr("articles_failed")
+            continue
+        metrics.observe_many(article.pop("timings"))
+        await analyzed.put(article)
+
+
+async def parse_article_time(article: Dict[str, Any]):
+    """
+    One Duckling call per article, relative to its publication date. A failed
+    call raises, so that the article is not written without its dates.
+    """
+    chunks = article["chunks"]
+    if not chunks:
         return
 
+    text, starts = join_chunks([chunk["content"] for chunk in chunks])
+    with metrics.timed("duckling"):
+        entities = await aparse_entities_with_duckling(
+            text, datetime.fromisoformat(article["date"]), strict=True
+        )
+    for chunk, (points, intervals) in zip(chunks, assign_entities(entities, starts)):
+        chunk["points"], chunk["intervals"] = points, intervals
+
+
+async def put_for_writer(write_queue: queue.Queue, item: Any, writer: asyncio.Task):
+    """
+    Puts an item into the queue of the writer thread; returns False instead
+    of blocking forever if the writer has stopped.
+    """
+    while not writer.done():
+        try:
+            await asyncio.to_thread(write_queue.put, item, timeout=WRITE_QUEUE_TIMEOUT)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+async def resolve_times(
+    analyzed: asyncio.Queue,
+    write_queue: queue.Queue,
+    checkpoints: Dict[str, IngestCheckpoint],
+    writer: asyncio.Task,
+    stop: threading.Event,
+):
+    while (article := await analyzed.get()) is not _DONE:
+        if stop.is_set():
+            # The writer has stopped; the queue is drained so that the
+            # earlier stages can finish.
+            continue
+        try:
+            await parse_article_time(article)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Left pending in the checkpoint, so a resumed run retries it.
+            logger.error(
+                f"Duckling failed for {article['shard']}:{article['line_number']}: {e}"
+            )
+            metrics.incr("articles_failed")
+            continue
+        except Exception as e:
+            logger.error(
+                f"Error parsing dates of {article['shard']}:{article['line_number']}: {e}"
+            )
+            checkpoints[article["shard"]].done(article["line_number"])
+            metrics.incr("articles_failed")
+            continue
+        if not await put_for_writer(write_queue, article, writer):
+            logger.error("Batch writer stopped, stopping ingestion")
+            stop.set()
+
+
+def add_article(
+    batch,
+    news_collection: weaviate.collections.Collection,
+    chunk_collection: weaviate.collections.Collection,
+    article: Dict[str, Any],
+) -> int:
+    """Adds the News object and its chunks to the batch; returns the chunk count."""
+    line_number = article["line_number"]
+    news_url = article["news_url"]
+    news_uuid = article["uuid"]
+    if article["changed"]:
+        # The new version may have fewer chunks than the stored one, and
+        # older copies of the article have chunks with random UUIDs.
+        chunk_collection.data.delete_many(
+            where=Filter.by_property("url").equal(news_url)
+        )
+    for stale_uuid in article["stale_uuids"]:
+        news_collection.data.delete_by_id(stale_uuid)
+
+    news_data = {
+        "date": article["date"],
+        "url": news_url,
+        "source_id": article["source_id"],
+        "content_hash": article["content_hash"],
+    }
+    batch.add_object("News", news_data, uuid=news_uuid)
+    log_sampled = sampled(line_number)
+    if log_sampled:
+        logger.debug(f"Created News object with UUID: {news_uuid} (line {line_number})")
+
+    if not article["chunks"]:
+        if log_sampled:
+            logger.debug(
+                f"No chunks generated for News UUID: {news_uuid} (line {line_number})"
+            )
+        return 0
+
+    for index, chunk_dict in enumerate(article["chunks"]):
+        chunk_uuid = chunk_object_uuid(news_url, index)
+        chunk_data = {
+            "content": chunk_dict["content"],
+            "lemmatized_content": chunk_dict["lemmatized_content"],
+            "lemmatized_keywords": chunk_dict["lemmatized_keywords"],
+            "temporal_points": chunk_dict["points"],
+            "temporal_intervals": chunk_dict["intervals"],
+            "date": article["date"],
+            "url": news_url,
+            "source_id": article["source_id"],
+        }
+        batch.add_object(
+            "Chunk",
+            chunk_data,
+            references={"news": news_uuid},
+            uuid=chunk_uuid,
+        )
+        if log_sampled:
+            logger.debug(
+                f"Created Chunk object with UUID: {chunk_uuid} for News UUID: {news_uuid}"
+            )
+    return len(article["chunks"])
+
+
+def retry_failed_objects(
+    client: weaviate.WeaviateClient, failed: List[ErrorObject]
+) -> List[ErrorObject]:
+    """
+    Re-sends objects that failed in a batch, up to INGEST_MAX_RETRIES times;
+    returns the objects that could not be written.
+    """
+    for attempt in range(1, INGEST_MAX_RETRIES + 1):
+        if not failed:
+            return failed
+        metrics.incr("objects_retried", len(failed))
+        errors = Counter(error.message for error in failed)
+        logger.warning(
+            f"Retrying {len(failed)} failed objects "
+            f"(attempt {attempt}/{INGEST_MAX_RETRIES}): {dict(errors)}"
+        )
+        with client.batch.dynamic() as batch:
+            for error in failed:
+                batch.add_object(
+                    error.object_.collection,
+                    error.object_.properties,
+                    references=error.object_.references,
+                    uuid=error.object_.uuid,
+                )
+        failed = client.batch.failed_objects
+
+    metrics.incr("objects_lost", len(failed))
+    for error in failed:
+        logger.error(
+            f"Failed to write {error.object_.collection} object "
+            f"{error.object_.uuid}: {error.message}"
+        )
+    return failed
+
+
+def clear_content_hash(news_collection: weaviate.collections.Collection, uuid: str):
+    """
+    Clears the stored hash of an article that was not written completely, so
+    that the next run does not skip it as unchanged.
+    """
+    try:
+        news_collection.data.update(uuid=uuid, properties={"content_hash": ""})
+    except Exception as e:
+        # The News object itself may not have been written.
+        logger.warning(f"Could not clear content hash of News {uuid}: {e}")
+
+
+def write_articles(
+    client: weaviate.WeaviateClient,
+    write_queue: queue.Queue,
+    checkpoints: Dict[str, IngestCheckpoint],
+):
+    """
+    Single batch writer; runs in its own thread. Articles are written in
+    batches of INGEST_CHECKPOINT_INTERVAL; after each batch the failed
+    objects are retried and the checkpoint is saved. Articles with an object
+    that could not be written stay pending in the checkpoint.
+    """
     news_collection = client.collections.get("News")
     chunk_collection = client.collections.get("Chunk")
+    finished = False
 
-    references_to_add = []
-
-    with client.batch.dynamic() as batch:
-        with open(jsonl_file, "r", encoding="utf-8") as file:
-            for line_number, line in enumerate(file, 1):
+    while not finished:
+        written = []
+        failed_urls = set()
+        chunks_written = 0
+        busy = 0.0
+        with client.batch.dynamic() as batch:
+            while len(written) < INGEST_CHECKPOINT_INTERVAL:
+                article = write_queue.get()
+                if article is _DONE:
+                    finished = True
+                    break
+                start = time.perf_counter()
                 try:
-                    data = json.loads(line.strip())
-
-                    date = data.get("date") / 1000
-                    date = (
-                        datetime.fromtimestamp(
-                            date, tz=ZoneInfo("Europe/Moscow")
-                        ).isoformat()
-                        if date
-                        else None
+                    chunks = add_article(
+                        batch, news_collection, chunk_collection, article
+                    )
+                    chunks_written += chunks
+                    metrics.incr("news_written")
+                    metrics.incr("chunks_written", chunks)
+                except Exception as e:
+                    logger.error(
+                        f"Error processing {article['shard']}:{article['line_number']}: {e}"
                     )
-                    logger.info(f"Parsed date: {date} (line {line_number})")
-                    text = data.get("text")
-                    source_id = data.get("source_id")
-                    news_url = data.get("news_url")
-
-                    if not all([date, source_id, news_url]):
-                        logger.warning(
-                            f"Skipping line {line_number}: Missing required fields (date, source_id, news_url)"
-                        )
-                        continue
-
-                    news_uuid = str(uuid.uuid4())
-                    news_data = {
-                        "date": date,
-                        "url": news_url,
-                        "source_id": source_id,
-                    }
-                    batch.add_object("News", news_data, uuid=news_uuid)
-                    logger.info(
-                        f"Created News object with UUID: {news_uuid} (line {line_number})"
+                    failed_urls.add(article["news_url"])
+                busy += time.perf_counter() - start
+                written.append(
+                    (
+                        article["shard"],
+                        article["line_number"],
+                        article["news_url"],
+                        article["uuid"],
                     )
+                )
+            flush_start = time.perf_counter()
+        busy += time.perf_counter() - flush_start
 
-                    chunks = chunk_text(text) if text else []
-                    if not chunks:
-                        logger.info(
-                            f"No chunks generated for News UUID: {news_uuid} (line {line_number})"
-                        )
-                        continue
-
-                    chunk_dicts = process_chunks(chunks, source_id=source_id, date=date)
-                    for chunk_dict in chunk_dicts:
-                        chunk_uuid = str(uuid.uuid4())
-                        chunk_data = {
-                            "content": chunk_dict["content"],
-                            "lemmatized_content": chunk_dict["lemmatized_content"],
-                            "lemmatized_keywords": chunk_dict["lemmatized_keywords"],
-                            "temporal_points": chunk_dict["points"],
-                            "temporal_intervals": chunk_dict["intervals"],
-                        }
-                        batch.add_object(
-                            "Chunk",
-                            chunk_data,
-                            uuid=chunk_uuid,
-                        )
-
-                        references_to_add.append(
-                            {
-                                "from_uuid": chunk_uuid,
-                                "to_uuid": news_uuid,
-                            }
-                        )
-                        logger.info(
-                            f"Created Chunk object with UUID: {chunk_uuid} for News UUID: {news_uuid}"
-                        )
+        if written:
+            metrics.observe("write", busy, len(written) + chunks_written)
+        failed = client.batch.failed_objects
+        metrics.incr("objects_failed", len(failed))
+        for error in retry_failed_objects(client, failed):
+            # News and Chunk objects both carry the article URL.
+            failed_urls.add(error.object_.properties["url"])
+        for shard, line_number, news_url, news_uuid in written:
+            if news_url in failed_urls:
+                clear_content_hash(news_collection, news_uuid)
+                metrics.incr("articles_failed")
+            else:
+                checkpoints[shard].done(line_number)
+        for shard in {shard for shard, *_ in written}:
+            checkpoints[shard].save()
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON at line {line_number}: {e}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing line {line_number}: {e}")
-                    continue
-
-        batch.flush()
-        for reference in references_to_add:
-            try:
-                batch.add_reference(
-                    from_uuid=reference["from_uuid"],
-                    to=reference["to_uuid"],
-                    from_property="news",
-                    from_collection="Chunk",
+    logger.info("Batch processing completed")
+    logger.info(f"Duckling cache: {duckling.stats()}")
+
+
+async def run_pipeline(
+    client: weaviate.WeaviateClient,
+    shards: List[str],
+    known_news: Dict[str, Dict[str, Any]],
+    checkpoints: Dict[str, IngestCheckpoint],
+) -> List[str]:
+    """
+    Shard readers -> process pool (chunking, lemmas, keywords) -> async Duckling
+    calls -> single batch writer, connected by bounded queues so that only
+    a fixed number of articles is in flight at any time. Returns the shards
+    that could not be read to the end.
+    """
+    articles = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    analyzed = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    write_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    metrics.reset()
+    metrics.start_reporter(
+        INGEST_REPORT_INTERVAL,
+        lambda: {
+            "articles": articles.qsize(),
+            "analyzed": analyzed.qsize(),
+            "write": write_queue.qsize(),
+        },
+    )
+
+    writer = asyncio.create_task(
+        asyncio.to_thread(write_articles, client, write_queue, checkpoints)
+    )
+    stop = threading.Event()
+    try:
+        # Spawned workers do not inherit the gRPC channels of the client.
+        with ProcessPoolExecutor(
+            max_workers=INGEST_WORKERS,
+            mp_context=mp.get_context("spawn"),
+            initializer=warmup,
+        ) as pool:
+            analyzers = [
+                asyncio.create_task(
+                    analyze_articles(articles, analyzed, pool, checkpoints)
                 )
-                logger.info(
-                    f"Added reference from Chunk UUID: {reference['from_uuid']} to News UUID: {reference['to_uuid']}"
+                for _ in range(INGEST_WORKERS * 2)
+            ]
+            resolvers = [
+                asyncio.create_task(
+                    resolve_times(analyzed, write_queue, checkpoints, writer, stop)
                 )
-            except Exception as e:
-                logger.error(f"Error adding reference: {e}")
-                continue
-        batch.flush()
-        logger.info("Batch processing completed")
+                for _ in range(INGEST_DUCKLING_CONCURRENCY)
+            ]
+            failed_shards = await read_articles(
+                shards, articles, len(analyzers), known_news, checkpoints, stop
+            )
+            await asyncio.gather(*analyzers)
+
+        for _ in resolvers:
+            await analyzed.put(_DONE)
+        await asyncio.gather(*resolvers)
+        return failed_shards
+    finally:
+        try:
+            await put_for_writer(write_queue, _DONE, writer)
+            # Raises the error of a writer that stopped early.
+            await writer
+        finally:
+            await duckling.aclose()
+            metrics.stop_reporter()
+
+
+def checkpoint_path(shard: str) -> str:
+    if INGEST_CHECKPOINT_DIR:
+        return os.path.join(
+            INGEST_CHECKPOINT_DIR, f"{os.path.basename(shard)}.checkpoint.json"
+        )
+    return f"{shard}.checkpoint.json"
+
+
+def populate_weaviate(client: weaviate.WeaviateClient, input_pattern: str):
+    """
+    Read JSONL shards matching a glob pattern (plain, .gz or .zst) and
+    populate News and Chunk collections.
+
+    Objects get deterministic UUIDs, so running it again updates the same
+    objects; articles with an unchanged content hash are skipped, and an
+    interrupted run resumes every shard from its checkpoint. News written
+    with random UUIDs before are replaced together with their chunks.
+    """
+    shards = find_shards(input_pattern)
+    if not shards:
+        logger.info(f"No files match {input_pattern}. Skipping population.")
+        return
+    logger.info(f"Ingesting {len(shards)} shards matching {input_pattern}")
+
+    known_news = load_known_news(client)
+    stale = sum(len(stored["stale"]) for stored in known_news.values())
+    logger.info(f"Loaded {len(known_news)} known news, {stale} to replace")
+    checkpoints = {
+        shard: IngestCheckpoint(checkpoint_path(shard), shard) for shard in shards
+    }
+
+    failed_shards = asyncio.run(run_pipeline(client, shards, known_news, checkpoints))
+    metrics.write_summary(INGEST_METRICS_PATH)
+    for shard, checkpoint in checkpoints.items():
+        if shard in failed_shards:
+            # A rerun resumes after the lines read before the error.
+            checkpoint.save()
+        else:
+            checkpoint.clear()
+    if failed_shards:
+        logger.error(f"Could not read {len(failed_shards)} shards: {failed_shards}")
+    invalidate_app_cache()
 
 
 def main():
     client = initialize_weaviate()
-    jsonl_file = "/data/news.jsonl"
-
     try:
-        # populate_weaviate(client, jsonl_file)
+        # populate_weaviate(client, INGEST_INPUT)
         logger.info("Database population completed")
     except Exception as e:
         logger.error(f"Database population failed: {e}")
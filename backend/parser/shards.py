@@ -0,0 +1,37 @@
+import glob
+import gzip
+import io
+from typing import BinaryIO, List
+
+import zstandard
+
+SHARD_EXTENSIONS = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+# Raised while reading missing, truncated or corrupt shards; gzip.BadGzipFile
+# is an OSError.
+SHARD_READ_ERRORS = (OSError, EOFError, zstandard.ZstdError)
+
+
+def find_shards(pattern: str) -> List[str]:
+    """Input files matching a glob pattern, in name order."""
+    return sorted(
+        path for path in glob.glob(pattern) if path.endswith(SHARD_EXTENSIONS)
+    )
+
+
+def is_compressed(path: str) -> bool:
+    return not path.endswith(".jsonl")
+
+
+def open_shard(path: str) -> BinaryIO:
+    """
+    Opens a JSONL shard for reading lines as bytes, decompressing gzip and
+    zstd shards on the fly.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+        return io.BufferedReader(reader)
+    return open(path, "rb")
@@ -1,6 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from processing import is_warm, start_warmup
 from router.process import router as process_router
+from router.process import start_pool, stop_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_pool()
+    # Runs while the server starts listening; /ready reports when it is done.
+    warmup_task = start_warmup()
+    try:
+        yield
+    finally:
+        # A failed warmup has already been logged.
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await stop_pool()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(process_router, prefix="/process")
+
+
+@app.get("/ready")
+def ready():
+    if not is_warm():
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return JSONResponse(content={"status": "ready"})
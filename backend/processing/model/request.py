@@ -1,9 +1,21 @@
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
 class ProcessNewsRequest(BaseModel):
     content: str
+    source_id: Optional[str] = None
+    date: Optional[str] = None
 
 
 class ProcessQueryRequest(BaseModel):
     text: str
+
+
+class ProcessNewsBatchRequest(BaseModel):
+    documents: List[ProcessNewsRequest]
+
+
+class ProcessQueryBatchRequest(BaseModel):
+    queries: List[ProcessQueryRequest]
@@ -1,17 +1,169 @@
+import asyncio
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from model.request import ProcessNewsRequest, ProcessQueryRequest
-from processing.chunking import chunk_text, process_chunks
-from processing.lemmatization import lemmatize_text
-from processing.time import parse_with_duckling
+from fastapi.responses import JSONResponse, StreamingResponse
+from model.request import (
+    ProcessNewsBatchRequest,
+    ProcessNewsRequest,
+    ProcessQueryBatchRequest,
+    ProcessQueryRequest,
+)
+from processing import warmup
+from processing.chunking import analyze_text, aprocess_analyzed_chunks, process_text
+from processing.lemmatization import lemmatize_many, lemmatize_text, lemmatizer
+from processing.time import aparse_with_duckling, duckling, parse_with_duckling
+
+PROCESSING_WORKERS = int(os.getenv("PROCESSING_WORKERS", os.cpu_count() or 1))
+# Documents sent to a worker process at once.
+PROCESSING_GROUP_SIZE = int(os.getenv("PROCESSING_GROUP_SIZE", 16))
+# Groups of one batch that are processed or waiting to be sent at once.
+PROCESSING_GROUPS_IN_FLIGHT = int(
+    os.getenv("PROCESSING_GROUPS_IN_FLIGHT", 2 * PROCESSING_WORKERS)
+)
 
 router = APIRouter()
 
+pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_pool():
+    global pool
+    pool = ProcessPoolExecutor(
+        max_workers=PROCESSING_WORKERS,
+        mp_context=mp.get_context("spawn"),
+        initializer=warmup,
+    )
+    # Starts the workers now, so they load their resources in the initializer
+    # before the first batch instead of during it.
+    for _ in range(PROCESSING_WORKERS):
+        pool.submit(_start_worker)
+
+
+def _start_worker():
+    """Nothing to do: the pool initializer has warmed the worker up."""
+
+
+async def stop_pool():
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+    await duckling.aclose()
+
+
+def _analyze_news(contents: List[str]) -> List[List[Dict[str, Any]]]:
+    """Chunks, lemmas and keywords of each document; runs in the worker pool."""
+    return [analyze_text(content, clean_content=True) for content in contents]
+
+
+def _lemmatize_queries(texts: List[str]) -> List[str]:
+    return lemmatize_many(texts)
+
+
+async def _finish_news(
+    document: ProcessNewsRequest, chunk_objects: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    return {
+        "chunks": await aprocess_analyzed_chunks(
+            chunk_objects, document.source_id, document.date
+        )
+    }
+
+
+async def _finish_query(
+    query: ProcessQueryRequest, lemmatized_query: str
+) -> Dict[str, Any]:
+    temporal_points, temporal_intervals = await aparse_with_duckling(query.text)
+    return {
+        "lemmatized_query": lemmatized_query,
+        "temporal_points": temporal_points,
+        "temporal_intervals": temporal_intervals,
+    }
+
+
+async def _process_batch(
+    items: List[Any],
+    texts: List[str],
+    analyze: Callable[[List[str]], List[Any]],
+    finish: Callable[[Any, Any], Awaitable[Dict[str, Any]]],
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Sends groups of texts to the worker pool, finishes every item with the
+    async Duckling client and yields results in input order as soon as they
+    are ready. A failed item yields an error instead of failing the batch.
+    At most PROCESSING_GROUPS_IN_FLIGHT groups are running or have results
+    that were not yielded yet, so large batches keep memory bounded.
+    """
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(PROCESSING_GROUPS_IN_FLIGHT)
+
+    async def run_group(start: int):
+        # Released once the results of the group have been yielded.
+        await in_flight.acquire()
+        end = start + PROCESSING_GROUP_SIZE
+        analyzed = await loop.run_in_executor(pool, analyze, texts[start:end])
+        return await asyncio.gather(
+            *(finish(item, result) for item, result in zip(items[start:end], analyzed)),
+            return_exceptions=True,
+        )
+
+    starts = range(0, len(items), PROCESSING_GROUP_SIZE)
+    tasks = [asyncio.ensure_future(run_group(start)) for start in starts]
+    try:
+        for start, task in zip(starts, tasks):
+            try:
+                results = await task
+            except Exception as e:
+                results = [e] * len(items[start : start + PROCESSING_GROUP_SIZE])
+            for index, result in enumerate(results, start):
+                if isinstance(result, Exception):
+                    yield {"index": index, "error": str(result)}
+                else:
+                    yield {"index": index, **result}
+            in_flight.release()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _batch_response(results: AsyncIterator[Dict[str, Any]], stream: bool):
+    if stream:
+        return StreamingResponse(
+            (json.dumps(result, ensure_ascii=False) + "\n" async for result in results),
+            media_type="application/x-ndjson",
+        )
+    return JSONResponse(content={"results": [result async for result in results]})
+
 
 @router.post("/news")
 def process_news(request: ProcessNewsRequest):
-    chunks = chunk_text(request.content)
-    return JSONResponse(content=process_chunks(chunks))
+    return JSONResponse(
+        content=process_text(
+            request.content,
+            source_id=request.source_id,
+            date=request.date,
+            clean_content=True,
+        )
+    )
+
+
+@router.post("/news/batch")
+async def process_news_batch(request: ProcessNewsBatchRequest, stream: bool = False):
+    """
+    Processes a list of articles in the worker pool. Results keep the input
+    order; with stream=true they are sent as NDJSON lines as they are ready.
+    """
+    documents = request.documents
+    results = _process_batch(
+        documents,
+        [document.content for document in documents],
+        _analyze_news,
+        _finish_news,
+    )
+    return await _batch_response(results, stream)
 
 
 @router.post("/query")
@@ -25,3 +177,23 @@ def process_query(request: ProcessQueryRequest):
             "temporal_intervals": temporal_intervals,
         }
     )
+
+
+@router.post("/query/batch")
+async def process_query_batch(request: ProcessQueryBatchRequest, stream: bool = False):
+    """Batch version of /query with the same ordering and streaming as /news/batch."""
+    queries = request.queries
+    results = _process_batch(
+        queries,
+        [query.text for query in queries],
+        _lemmatize_queries,
+        _finish_query,
+    )
+    return await _batch_response(results, stream)
+
+
+@router.get("/stats")
+def stats():
+    return JSONResponse(
+        content={"lemmatizer": lemmatizer.stats(), "duckling": duckling.stats()}
+    )
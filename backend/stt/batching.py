@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Groups concurrent requests into batches for one inference function.
+
+    A batch is started by the first waiting request and closed when it has
+    max_batch_size requests or max_wait seconds have passed, whichever comes
+    first. Batches run one at a time on a dedicated thread, so the event
+    loop stays free and the next batch fills up while the current one runs.
+    Requests that are queued or in the current batch when the batcher stops
+    fail instead of waiting forever.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait: float,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.items = 0
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            queued = []
+            while not self._queue.empty():
+                queued.append(self._queue.get_nowait())
+            self._fail(queued)
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]]):
+        error = RuntimeError("Batcher stopped")
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None or self._worker.done():
+            raise RuntimeError("Batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Fills batch in place, so that a stopped worker can fail it."""
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _process(self, batch: List[Tuple[Any, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self.process_batch, items
+            )
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Got {len(results)} results for a batch of {len(items)}"
+                )
+        except Exception as e:
+            if len(batch) > 1:
+                # Runs the requests one by one, so that a single bad input
+                # fails only its own request.
+                logger.warning(f"Batch of {len(batch)} failed, splitting: {e}")
+                for request in batch:
+                    await self._process([request])
+                return
+            logger.error(f"Request failed: {e}")
+            if not batch[0][1].done():
+                batch[0][1].set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(items)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        batch = []
+        try:
+            while True:
+                batch = []
+                await self._collect(batch)
+                # Requests whose client went away are not worth running.
+                batch = [request for request in batch if not request[1].done()]
+                if batch:
+                    await self._process(batch)
+        except asyncio.CancelledError:
+            self._fail(batch)
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -1,28 +1,84 @@
+import io
 import os
-import tempfile
+from contextlib import asynccontextmanager
+from typing import List
 
 import gigaam
+import torch
+from batching import MicroBatcher
 from fastapi import FastAPI, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+from utils import SAMPLE_RATE, convert_to_torch_tensor
 
+PORT = os.getenv("PORT", 8003)
+MODEL_TYPE = os.getenv("MODEL_TYPE", "rnnt")
+# Same limit as model.transcribe; longer audio needs transcribe_longform.
+MAX_AUDIO_SECONDS = 25
+# Larger batches and waits raise throughput under load at the cost of the
+# latency of a single request.
+STT_MAX_BATCH_SIZE = int(os.getenv("STT_MAX_BATCH_SIZE", 8))
+STT_MAX_WAIT_MS = float(os.getenv("STT_MAX_WAIT_MS", 20))
+STT_INFERENCE_THREADS = int(os.getenv("STT_INFERENCE_THREADS", os.cpu_count() or 1))
+
+torch.set_num_threads(STT_INFERENCE_THREADS)
 model = gigaam.load_model(model_name="rnnt", device="cpu", download_root="/models")
 
-app = FastAPI()
 
-PORT = os.getenv("PORT", 8003)
-MODEL_TYPE = os.getenv("MODEL_TYPE", "rnnt")
+@torch.inference_mode()
+def transcribe_batch(wavs: List[torch.Tensor]) -> List[str]:
+    """
+    model.transcribe for a batch of decoded audio: the clips are padded
+    with silence to the longest one and go through one forward pass, the
+    real lengths are passed along.
+    """
+    parameter = next(model.parameters())
+    lengths = torch.tensor([wav.shape[-1] for wav in wavs], device=parameter.device)
+    batch = torch.nn.utils.rnn.pad_sequence(wavs, batch_first=True)
+    batch = batch.to(parameter.device).to(parameter.dtype)
+    encoded, encoded_len = model.forward(batch, lengths)
+    return model.decoding.decode(model.head, encoded, encoded_len)
+
+
+batcher = MicroBatcher(
+    transcribe_batch,
+    max_batch_size=STT_MAX_BATCH_SIZE,
+    max_wait=STT_MAX_WAIT_MS / 1000,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    batcher.start()
+    yield
+    await batcher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def decode_audio(data: bytes) -> torch.Tensor:
+    """Decodes the upload through an ffmpeg pipe, without writing it to disk."""
+    wav = convert_to_torch_tensor(io.BytesIO(data))
+    if wav.shape[-1] > MAX_AUDIO_SECONDS * SAMPLE_RATE:
+        raise ValueError("Too long audio, use transcribe_longform")
+    return wav
 
 
 @app.post("/transcribe")
 async def transcribe_audio(file: UploadFile = File(...)):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as temp:
-        temp_path = temp.name
-        temp.write(await file.read())
-        try:
-            transcription = model.transcribe(temp_path)
-            return JSONResponse(content={"transcription": transcription})
-        finally:
-            os.unlink(temp_path)
+    data = await file.read()
+    try:
+        wav = await run_in_threadpool(decode_audio, data)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    transcription = await batcher.submit(wav)
+    return JSONResponse(content={"transcription": transcription})
+
+
+@app.get("/stats")
+async def stats():
+    return JSONResponse(content={"batching": batcher.stats()})
 
 
 @app.get("/healthcheck")
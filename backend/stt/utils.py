@@ -26,6 +26,10 @@ def convert_to_torch_tensor(file_obj, sample_rate: int = SAMPLE_RATE) -> torch.T
     process = subprocess.Popen(
         cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
     )
-    pcm_data, _ = process.communicate(input=file_obj.read())
-    tensor = torch.frombuffer(pcm_data, dtype=torch.int16).float() / 32768.0
+    pcm_data, stderr = process.communicate(input=file_obj.read())
+    if process.returncode != 0 or not pcm_data:
+        raise ValueError(
+            f"Failed to decode audio: {stderr.decode(errors='replace').strip()}"
+        )
+    tensor = torch.frombuffer(bytearray(pcm_data), dtype=torch.int16).float() / 32768.0
     return tensor
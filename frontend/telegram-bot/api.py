@@ -1,5 +1,8 @@
+import json
 import os
+from typing import AsyncIterator
 
+import aiohttp
 import requests
 
 # from tts import SberSpeechAPI
@@ -17,6 +20,34 @@ async def generate_response(prompt: str) -> str:
     return message
 
 
+async def stream_response(prompt: str) -> AsyncIterator[str]:
+    """
+    Yields answer text deltas from the app's server-sent events stream.
+    """
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            f"{API_BASE_URL}/api/generate_stream",
+            json={"text": prompt},
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=60),
+        ) as response:
+            response.raise_for_status()
+            event = "message"
+            async for line in response.content:
+                line = line.decode("utf-8").rstrip("\n")
+                if line.startswith("event: "):
+                    event = line[len("event: ") :]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: ") :])
+                    if event == "message":
+                        yield data["delta"]
+                    elif event == "error":
+                        raise Exception(f"Streaming generation failed: {data['error']}")
+                    elif event == "done":
+                        return
+                elif not line:
+                    event = "message"
+
+
 async def transcribe_audio(audio_file: bytearray) -> str:
     response = requests.post(
         f"{STT_URL}/transcribe",
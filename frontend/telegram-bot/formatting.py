@@ -0,0 +1,39 @@
+import re
+
+TAG_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^<>]*?(/?)>")
+VOID_TAGS = {"br"}
+
+
+def close_open_tags(text: str) -> str:
+    """
+    Makes a partial Telegram HTML answer safe to send.
+
+    Drops a trailing tag or entity that has not been fully received yet and
+    closes the tags that are still open, so every intermediate edit of a
+    streamed answer is valid HTML.
+    """
+    last_open = text.rfind("<")
+    if last_open > text.rfind(">"):
+        text = text[:last_open]
+    last_amp = text.rfind("&")
+    # An "&" inside a complete tag, e.g. in a link URL, is not an entity.
+    if (
+        last_amp > text.rfind(">")
+        and ";" not in text[last_amp:]
+        and " " not in text[last_amp:]
+    ):
+        text = text[:last_amp]
+
+    open_tags = []
+    for match in TAG_RE.finditer(text):
+        closing, name, self_closing = match.groups()
+        name = name.lower()
+        if self_closing or name in VOID_TAGS:
+            continue
+        if not closing:
+            open_tags.append(name)
+        elif name in open_tags:
+            while open_tags and open_tags.pop() != name:
+                pass
+
+    return text + "".join(f"</{name}>" for name in reversed(open_tags))
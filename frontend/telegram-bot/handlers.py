@@ -1,19 +1,75 @@
+import asyncio
 import os
+import time
+from datetime import timedelta
+from typing import Optional
 
 import telegram
 import telegram.ext
-from api import generate_response, transcribe_audio
 from telegram import Update
+from telegram.error import BadRequest, RetryAfter
+
+from api import generate_response, stream_response, transcribe_audio
+from formatting import close_open_tags
 from tts import SberSpeechAPI
 
 tts_api = SberSpeechAPI(os.getenv("SALUTE_SPEECH_AUTH_TOKEN"))
 
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", 1.0))
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    # Newer python-telegram-bot versions can return a timedelta.
+    if isinstance(error.retry_after, timedelta):
+        return error.retry_after.total_seconds()
+    return float(error.retry_after)
+
 
 async def handle_message(update: Update, context: telegram.ext.CallbackContext):
     user_input = update.message.text
     await update.message.chat.send_chat_action("typing")
-    response = await generate_response(user_input)
-    await update.message.reply_text(response, parse_mode="HTML")
+
+    reply = None
+    sent_text = ""
+    response = ""
+    last_edit = 0.0
+
+    async def send(text: str, parse_mode: Optional[str] = "HTML"):
+        nonlocal reply, sent_text
+        if parse_mode == "HTML":
+            text = close_open_tags(text)
+        if not text.strip() or text == sent_text:
+            return
+        if reply is None:
+            reply = await update.message.reply_text(text, parse_mode=parse_mode)
+        else:
+            await reply.edit_text(text, parse_mode=parse_mode)
+        sent_text = text
+
+    async for delta in stream_response(user_input):
+        response += delta
+        if time.monotonic() - last_edit >= STREAM_EDIT_INTERVAL:
+            try:
+                await send(response)
+            except BadRequest:
+                pass
+            except RetryAfter as e:
+                # Flood control: no edits until Telegram allows them again.
+                last_edit = time.monotonic() + retry_after_seconds(e)
+                continue
+            last_edit = time.monotonic()
+
+    async def send_final():
+        try:
+            await send(response)
+        except BadRequest:
+            await send(response, parse_mode=None)
+
+    try:
+        await send_final()
+    except RetryAfter as e:
+        await asyncio.sleep(retry_after_seconds(e))
+        await send_final()
 
 
 async def handle_voice_message(update: Update, context: telegram.ext.CallbackContext):
@@ -0,0 +1,144 @@
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend", "common"))
+
+from processing.analysis import TextAnalysis
+from processing.chunking import chunk_sentences
+from processing.keywords import (
+    ARTICLE_SCORE_EXPONENT,
+    article_extractor,
+    assign_keywords,
+    chunk_extractor,
+    extract_keywords,
+    extract_keywords_many,
+)
+
+N_ARTICLES = 500
+
+
+def load_articles(path, limit):
+    articles = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                text = json.loads(line)["text"]
+            except (json.JSONDecodeError, KeyError):
+                continue
+            analysis = TextAnalysis(text)
+            articles.append(
+                [
+                    analysis.cleaned_text(first, last)
+                    for first, last in chunk_sentences(analysis)
+                ]
+            )
+            if len(articles) == limit:
+                break
+    return articles
+
+
+def jaccard(a, b):
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def compare(old, new):
+    """Mean Jaccard per chunk, previous keywords found and new ones added."""
+    overlap = sum(jaccard(a, b) for a, b in zip(old, new)) / len(old) if old else 1.0
+    found = sum(len(set(a) & set(b)) for a, b in zip(old, new))
+    total = sum(len(set(a)) for a in old)
+    added = sum(len(set(b) - set(a)) for a, b in zip(old, new))
+    return overlap, found, total, added
+
+
+def fit_score_exponent(articles):
+    """
+    Fits k in article_score / chunk_score = n ** -k over keywords found both
+    in a chunk and in its article of n chunks, by least squares on logs.
+    """
+    ratios = defaultdict(list)
+    for chunks in articles:
+        scores = {
+            keyword.lower(): score
+            for keyword, score in article_extractor().extract_keywords(" ".join(chunks))
+        }
+        for chunk in chunks:
+            for keyword, score in chunk_extractor().extract_keywords(chunk):
+                if keyword.lower() in scores and len(chunks) > 1:
+                    ratios[len(chunks)].append(
+                        math.log(scores[keyword.lower()] / score)
+                    )
+    numerator = sum(-r * math.log(n) for n, rs in ratios.items() for r in rs)
+    denominator = sum(len(rs) * math.log(n) ** 2 for n, rs in ratios.items())
+    return numerator / denominator if denominator else None
+
+
+def unfiltered(articles):
+    """Top keywords of both methods without the score filter."""
+    per_chunk = [
+        [keyword for keyword, _ in chunk_extractor().extract_keywords(chunk)]
+        for chunks in articles
+        for chunk in chunks
+    ]
+    per_article = [
+        keywords
+        for chunks in articles
+        for keywords in assign_keywords(
+            [
+                keyword
+                for keyword, _ in article_extractor().extract_keywords(" ".join(chunks))
+            ],
+            chunks,
+        )
+    ]
+    return per_chunk, per_article
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "/data/news.jsonl"
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else N_ARTICLES
+    articles = load_articles(path, limit)
+    n_chunks = sum(len(chunks) for chunks in articles)
+
+    start = time.perf_counter()
+    per_chunk = [[extract_keywords(chunk) for chunk in chunks] for chunks in articles]
+    per_chunk_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_article = extract_keywords_many(articles)
+    per_article_seconds = time.perf_counter() - start
+
+    old = [keywords for chunks in per_chunk for keywords in chunks]
+    new = [keywords for chunks in per_article for keywords in chunks]
+
+    print(f"Статей: {len(articles)}, чанков: {n_chunks}")
+    for name, seconds in (
+        ("По чанкам", per_chunk_seconds),
+        ("По статьям", per_article_seconds),
+    ):
+        print(
+            f"{name}: {seconds:.2f} с, {len(articles) / seconds:.1f} статей/с, "
+            f"{n_chunks / seconds:.1f} чанков/с"
+        )
+    print(f"Ускорение: {per_chunk_seconds / per_article_seconds:.2f}x")
+    for name, (old, new) in (
+        ("С фильтром по score", (old, new)),
+        ("Без фильтра", unfiltered(articles)),
+    ):
+        overlap, found, total, added = compare(old, new)
+        print(
+            f"{name}: пересечение (Жаккар) по чанкам {overlap:.3f}, "
+            f"найдено прежних ключевых слов {found}/{total}, новых {added}, "
+            f"чанков с ключевыми словами {sum(map(bool, old))}/{len(old)} "
+            f"-> {sum(map(bool, new))}/{len(new)}"
+        )
+    exponent = fit_score_exponent(articles)
+    if exponent is not None:
+        print(
+            f"Показатель масштаба score статьи: {exponent:.2f} "
+            f"(ARTICLE_SCORE_EXPONENT={ARTICLE_SCORE_EXPONENT})"
+        )
@@ -0,0 +1,49 @@
+import os
+import statistics
+import subprocess
+import sys
+
+COMMON = os.path.join(os.path.dirname(__file__), "..", "backend", "common")
+N_RUNS = 5
+
+# Every case runs in a fresh interpreter, so nothing is cached between them.
+CASES = {
+    "import processing.time": "import processing.time",
+    "import processing.lemmatization": "import processing.lemmatization",
+    "import processing.chunking": "import processing.chunking",
+    "warmup(keywords=False)": "import processing; processing.warmup(keywords=False)",
+    "warmup()": "import processing; processing.warmup()",
+    "первый analyze_text": (
+        "from processing.chunking import analyze_text; "
+        "analyze_text('Вчера в Москве прошел дождь. Сегодня солнце.')"
+    ),
+}
+
+TIMER = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(code):
+    env = {**os.environ, "PYTHONPATH": COMMON}
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else N_RUNS
+    for name, code in CASES.items():
+        timings = [measure(code) for _ in range(runs)]
+        print(
+            f"{name}: медиана {statistics.median(timings) * 1000:.0f} мс, "
+            f"максимум {max(timings) * 1000:.0f} мс"
+        )
@@ -0,0 +1,125 @@
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend", "app"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend", "common"))
+
+from generation.search import _calculate_temporal_scores
+
+N_CASES = 2000
+TZ = ZoneInfo("Europe/Moscow")
+
+
+def reference_temporal_score(
+    query_intervals,
+    query_points,
+    query_date,
+    chunk_intervals,
+    chunk_points,
+    chunk_date,
+):
+    """Исходная поштучная реализация из search.py, используется как эталон."""
+    temporal_score = 0.0
+
+    reference_times = [query_date]
+    if query_intervals:
+        for start, end in query_intervals:
+            midpoint = start + (end - start) / 2
+            reference_times.append(midpoint)
+    if query_points:
+        reference_times.extend(query_points)
+
+    durations = (
+        [(end - start).total_seconds() for start, end in query_intervals]
+        if query_intervals
+        else []
+    )
+    max_duration = max(durations + [367 * 86400], default=367 * 86400)
+
+    point_score = 0.0
+    all_points = chunk_points + [chunk_date]
+    max_point_score = 0.0
+    for point in all_points:
+        min_distance = min(
+            abs((point - ref).total_seconds()) for ref in reference_times
+        )
+        point_score = max(0.0, 1.0 - min_distance / (max_duration * 2))
+        max_point_score = max(max_point_score, point_score)
+    temporal_score += max_point_score * 0.5
+
+    interval_score = 0.0
+    if chunk_intervals and query_intervals:
+        max_overlap_score = 0.0
+        for c_start, c_end in chunk_intervals:
+            for q_start, q_end in query_intervals:
+                intersect_start = max(c_start, q_start)
+                intersect_end = min(c_end, q_end)
+                intersection = max(0, (intersect_end - intersect_start).total_seconds())
+                union = (max(c_end, q_end) - min(c_start, q_start)).total_seconds()
+                overlap_score = intersection / union if union > 0 else 0.0
+                max_overlap_score = max(max_overlap_score, overlap_score)
+        interval_score = max_overlap_score
+        temporal_score += interval_score * 0.5
+
+    return temporal_score
+
+
+def random_datetime(now):
+    return now - timedelta(seconds=random.randint(0, 3 * 365 * 86400))
+
+
+def random_interval(now):
+    start = random_datetime(now)
+    return (start, start + timedelta(seconds=random.randint(0, 400 * 86400)))
+
+
+def random_case(now):
+    query_intervals = [random_interval(now) for _ in range(random.randint(0, 3))]
+    query_points = [random_datetime(now) for _ in range(random.randint(0, 3))]
+    n_chunks = random.randint(0, 40)
+    chunks_intervals = [
+        [random_interval(now) for _ in range(random.randint(0, 3))]
+        for _ in range(n_chunks)
+    ]
+    chunks_points = [
+        [random_datetime(now) for _ in range(random.randint(0, 3))]
+        for _ in range(n_chunks)
+    ]
+    chunk_dates = [random_datetime(now) for _ in range(n_chunks)]
+    return query_intervals, query_points, chunks_intervals, chunks_points, chunk_dates
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    now = datetime.now(tz=TZ)
+
+    for case in range(N_CASES):
+        query_intervals, query_points, chunks_intervals, chunks_points, chunk_dates = (
+            random_case(now)
+        )
+        expected = [
+            reference_temporal_score(
+                query_intervals, query_points, now, intervals, points, date
+            )
+            for intervals, points, date in zip(
+                chunks_intervals, chunks_points, chunk_dates
+            )
+        ]
+        actual = _calculate_temporal_scores(
+            query_intervals,
+            query_points,
+            now,
+            chunks_intervals,
+            chunks_points,
+            chunk_dates,
+        )
+        if not np.allclose(actual, expected, rtol=1e-9, atol=1e-9):
+            print(f"Расхождение в случае {case}: {actual} != {expected}")
+            sys.exit(1)
+
+    print(f"Векторизованный расчёт совпадает с эталоном на {N_CASES} случаях.")